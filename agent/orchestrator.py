@@ -360,6 +360,15 @@ def _extract_final_assistant_summary(payload: dict[str, Any]) -> str:
     return ""
 
 
+def configure_plan_storage(config: AgentConfig) -> None:
+    """Apply the configured plan backend once, at application startup."""
+    plan_ops.configure_backend(
+        str(config.plan_backend),
+        str(config.plan_db),
+        render_markdown=bool(config.plan_render_markdown),
+    )
+
+
 @dataclass
 class CodingOrchestrator:
     """OpenAI-only orchestrator powered by LangChain Deep Agents."""
@@ -419,7 +428,7 @@ class CodingOrchestrator:
                 f"User request: {user_request}",
                 f"Project name: {project_name}",
                 f"Project root: {project_root}",
-                f"Plan file: {self.config.plan_file}",
+                f"Plan: {self.config.plan_file} (use the plan tools to access it)",
                 "",
                 "Execution requirements:",
                 f"- Implement code changes under {project_root}.",
@@ -602,6 +611,7 @@ def main() -> None:
     )
     args = parser.parse_args()
 
+    configure_plan_storage(settings)
     orchestrator = CodingOrchestrator()
     result = orchestrator.run(
         args.request,
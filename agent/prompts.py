@@ -17,7 +17,8 @@ Execution contract:
 - If blocked, explain the concrete blocker and the smallest next action.
 
 Plan discipline:
-- Keep the markdown plan state current using available plan tools.
+- Keep the plan state current using the plan and todo tools; do not read or
+  edit the plan file directly, since it may not exist on disk.
 - Mark progress as tasks complete and note blockers with explicit reasons.
 
 Quality bar:
@@ -7,14 +7,17 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
+from agent.orchestrator import configure_plan_storage
 from agent_api.logging import configure_logging
 from agent_api.routers import health, runs
 from agent_api.service import AgentRunManager
+from config import settings
 
 
 def create_app(run_manager: AgentRunManager | None = None) -> FastAPI:
     """Create and configure the FastAPI application."""
     configure_logging()
+    configure_plan_storage(settings)
 
     managed_run_manager = run_manager or AgentRunManager()
     should_shutdown_manager = run_manager is None
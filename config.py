@@ -24,6 +24,9 @@ class AgentConfig:
     max_parallel_tasks: int | None = None
     projects_root: str | None = None
     plan_file: str | None = None
+    plan_backend: str | None = None
+    plan_db: str | None = None
+    plan_render_markdown: bool | None = None
     run_tests_command: str | None = None
 
     def __post_init__(self) -> None:
@@ -119,6 +122,29 @@ class AgentConfig:
         )
         plan_file = plan_file.strip() or "agent_plan.md"
 
+        plan_backend = (
+            self.plan_backend
+            if self.plan_backend is not None
+            else os.getenv("AGENT_PLAN_BACKEND", "file")
+        )
+        plan_backend = plan_backend.strip().lower()
+        if plan_backend not in {"file", "sqlite"}:
+            plan_backend = "file"
+
+        plan_db = (
+            self.plan_db
+            if self.plan_db is not None
+            else os.getenv("AGENT_PLAN_DB", "agent_plans.sqlite3")
+        )
+        plan_db = plan_db.strip() or "agent_plans.sqlite3"
+
+        if self.plan_render_markdown is None:
+            plan_render_markdown = (
+                os.getenv("AGENT_PLAN_RENDER_MD", "true").strip().lower() == "true"
+            )
+        else:
+            plan_render_markdown = bool(self.plan_render_markdown)
+
         run_tests_command = (
             self.run_tests_command
             if self.run_tests_command is not None
@@ -137,6 +163,9 @@ class AgentConfig:
         object.__setattr__(self, "max_parallel_tasks", max_parallel_tasks)
         object.__setattr__(self, "projects_root", projects_root)
         object.__setattr__(self, "plan_file", plan_file)
+        object.__setattr__(self, "plan_backend", plan_backend)
+        object.__setattr__(self, "plan_db", plan_db)
+        object.__setattr__(self, "plan_render_markdown", plan_render_markdown)
         object.__setattr__(self, "run_tests_command", run_tests_command)
 
 
@@ -0,0 +1,68 @@
+import shutil
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from utils import plans
+
+_PREBUILT_TIMESTAMP = "2025-01-01T00:00:00+00:00"
+PREBUILT_PLAN_STATE = {
+    "task": "Shared base plan",
+    "status": "active",
+    "created_at": _PREBUILT_TIMESTAMP,
+    "updated_at": _PREBUILT_TIMESTAMP,
+    "percent_complete": 0,
+    "steps": [
+        {"id": 1, "description": "Step one", "status": "in_progress"},
+        {"id": 2, "description": "Step two", "status": "pending"},
+    ],
+    "subgoals": [],
+    "progress_log": [
+        {
+            "timestamp": _PREBUILT_TIMESTAMP,
+            "message": "Plan created",
+            "percent_complete": 0,
+        }
+    ],
+    "reflections": [],
+}
+
+
+@pytest.fixture(scope="session")
+def prebuilt_plan(tmp_path_factory: pytest.TempPathFactory) -> Iterator[Path]:
+    """Write one minimal two-step plan per session for tests to copy."""
+    plan_path = tmp_path_factory.mktemp("prebuilt_plan") / "plan.md"
+    plans._write_raw_state(plan_path, PREBUILT_PLAN_STATE)
+    yield plan_path
+
+
+@pytest.fixture
+def plan_workspace(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Scope plan operations to a per-test temporary workspace root."""
+    root = tmp_path.resolve()
+    monkeypatch.setattr(plans, "WORKSPACE_ROOT", root)
+    return root
+
+
+@pytest.fixture
+def plan_file(plan_workspace: Path) -> str:
+    """Return an absolute, not-yet-created plan path inside the temp workspace."""
+    return str(plan_workspace / "plan.md")
+
+
+@pytest.fixture
+def memory_plan_backend(
+    plan_workspace: Path, monkeypatch: pytest.MonkeyPatch
+) -> plans.MemoryPlanBackend:
+    """Route plan persistence to an in-memory backend for this test."""
+    backend = plans.MemoryPlanBackend()
+    monkeypatch.setattr(plans, "_BACKEND", backend)
+    return backend
+
+
+@pytest.fixture
+def seeded_plan_file(plan_file: str, prebuilt_plan: Path) -> str:
+    """Return a private copy of the prebuilt plan inside the temp workspace."""
+    shutil.copyfile(prebuilt_plan, plan_file)
+    return plan_file
@@ -29,3 +29,24 @@ def test_agent_config_uses_openai_provider_from_env(monkeypatch) -> None:
     assert config.api_key == "openai-key"
     assert config.model_name == "gpt-5-mini"
     assert config.base_url == "https://api.openai.com/v1"
+
+
+def test_agent_config_reads_plan_backend_settings(monkeypatch) -> None:
+    monkeypatch.setenv("AGENT_PLAN_BACKEND", " SQLite ")
+    monkeypatch.setenv("AGENT_PLAN_DB", "state/plans.sqlite3")
+
+    config = AgentConfig()
+
+    assert config.plan_backend == "sqlite"
+    assert config.plan_db == "state/plans.sqlite3"
+
+    monkeypatch.setenv("AGENT_PLAN_BACKEND", "redis")
+    assert AgentConfig().plan_backend == "file"
+
+
+def test_agent_config_reads_plan_markdown_rendering(monkeypatch) -> None:
+    monkeypatch.delenv("AGENT_PLAN_RENDER_MD", raising=False)
+    assert AgentConfig().plan_render_markdown is True
+
+    monkeypatch.setenv("AGENT_PLAN_RENDER_MD", "False")
+    assert AgentConfig().plan_render_markdown is False
@@ -0,0 +1,348 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+
+import pytest
+
+from utils import files
+
+
+@pytest.fixture
+def file_workspace(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Scope file operations to a per-test temporary workspace root."""
+    root = tmp_path.resolve()
+    monkeypatch.setattr(files, "WORKSPACE_ROOT", root)
+    return root
+
+
+def test_resolve_rechecks_directories_swapped_for_symlinks(
+    file_workspace: Path, tmp_path_factory: pytest.TempPathFactory
+) -> None:
+    outside = tmp_path_factory.mktemp("outside")
+    (file_workspace / "data").mkdir()
+    assert files._resolve_workspace_path("data/x.txt") == file_workspace / "data/x.txt"
+
+    (file_workspace / "data").rmdir()
+    (file_workspace / "data").symlink_to(outside)
+
+    assert files.write_file("data/x.txt", "escaped").startswith("Error:")
+    assert not (outside / "x.txt").exists()
+
+
+def test_binary_sniff_uses_extension_bom_and_null_bytes(file_workspace: Path) -> None:
+    (file_workspace / "notes.md").write_bytes(b"text\x00with null")
+    (file_workspace / "blob.dat").write_bytes(b"abc\x00def")
+    (file_workspace / "wide.dat").write_bytes("hi".encode("utf-16"))
+    (file_workspace / "plain.dat").write_bytes(b"plain text")
+
+    assert files.safe_list_files(".") == ["notes.md", "plain.dat", "wide.dat"]
+
+
+def test_search_in_files_matches_large_and_small_files(file_workspace: Path) -> None:
+    filler = "x = 1\n" * 4000
+    (file_workspace / "big.py").write_text(f"{filler}Needle here\n", encoding="utf-8")
+    (file_workspace / "small.py").write_text("a needle\n", encoding="utf-8")
+    (file_workspace / "miss.py").write_text(filler, encoding="utf-8")
+
+    sensitive = files.search_in_files("Needle", case_sensitive=True)
+    insensitive = files.search_in_files("NEEDLE")
+
+    assert [(hit["path"], hit["line_number"]) for hit in sensitive] == [
+        ("big.py", 4001)
+    ]
+    assert sorted((hit["path"], hit["line_number"]) for hit in insensitive) == [
+        ("big.py", 4001),
+        ("small.py", 1),
+    ]
+
+
+def test_parallel_scans_match_sequential_results(file_workspace: Path) -> None:
+    for index in range(files.PARALLEL_SCAN_MIN_FILES + 10):
+        (file_workspace / f"f{index:03d}.txt").write_text("hit\n", encoding="utf-8")
+
+    listed = files.safe_list_files(".")
+    hits = files.search_in_files("hit", max_results=5)
+
+    assert len(listed) == files.PARALLEL_SCAN_MIN_FILES + 10
+    assert len(hits) == 5
+
+
+def test_map_files_runs_small_batches_inline_and_reuses_one_pool() -> None:
+    def thread_name(_: int) -> str:
+        return threading.current_thread().name
+
+    small = files._map_files(
+        thread_name, list(range(files.PARALLEL_SCAN_MIN_FILES - 1))
+    )
+    assert set(small) == {threading.current_thread().name}
+
+    large = list(range(files.PARALLEL_SCAN_MIN_FILES))
+    first = set(files._map_files(thread_name, large))
+    executor = files._file_executor()
+    second = set(files._map_files(thread_name, large))
+
+    assert all(name.startswith("file-scan") for name in first | second)
+    assert files._file_executor() is executor
+    assert len(first | second) <= files._file_worker_count()
+
+
+def test_safe_list_files_skips_ignored_and_symlinked_dirs(file_workspace: Path) -> None:
+    (file_workspace / "src").mkdir()
+    (file_workspace / "src/app.py").write_text("x = 1\n", encoding="utf-8")
+    (file_workspace / "__pycache__").mkdir()
+    (file_workspace / "__pycache__/app.txt").write_text("cached\n", encoding="utf-8")
+    (file_workspace / "alias").symlink_to(file_workspace / "src")
+
+    assert files.safe_list_files(".") == ["src/app.py"]
+
+
+def test_read_and_hash_use_raw_descriptors(file_workspace: Path) -> None:
+    payload = b"line one\r\nline two\rline three\n"
+    (file_workspace / "crlf.txt").write_bytes(payload)
+
+    assert files.read_file("crlf.txt") == "line one\nline two\nline three\n"
+    assert files.compute_file_hash("crlf.txt") == (
+        f"sha256:{hashlib.sha256(payload).hexdigest()}"
+    )
+
+
+def test_get_file_tree_lists_directories_first_depth_first(
+    file_workspace: Path,
+) -> None:
+    (file_workspace / "pkg/sub").mkdir(parents=True)
+    (file_workspace / "pkg/sub/deep.py").write_text("", encoding="utf-8")
+    (file_workspace / "pkg/B.py").write_text("", encoding="utf-8")
+    (file_workspace / "pkg/a.py").write_text("", encoding="utf-8")
+    (file_workspace / "README.md").write_text("", encoding="utf-8")
+
+    assert files.get_file_tree(".", indent_unit="  ") == "\n".join(
+        ["pkg/", "  sub/", "    deep.py", "  a.py", "  B.py", "README.md"]
+    )
+
+
+def test_list_all_and_find_files_include_hidden_and_skip_dir_links(
+    file_workspace: Path,
+) -> None:
+    (file_workspace / ".config").mkdir()
+    (file_workspace / ".config/app.toml").write_text("", encoding="utf-8")
+    (file_workspace / "src").mkdir()
+    (file_workspace / "src/main.py").write_text("", encoding="utf-8")
+    (file_workspace / "alias").symlink_to(file_workspace / "src")
+    (file_workspace / "dangling").symlink_to(file_workspace / "missing")
+
+    assert files.list_all_files(".") == [".config/app.toml", "src/main.py"]
+    assert files.find_files("*.py") == ["src/main.py"]
+    assert files.find_files("src/*") == ["src/main.py"]
+    assert files.find_files("s*n.py") == ["src/main.py"]
+    assert files.find_files("main.py") == ["src/main.py"]
+
+
+@pytest.mark.parametrize(
+    ("old", "new", "count", "expected_count", "expected_text"),
+    [
+        ("a", "xyz", -1, 3, "xyzbxyzbxyz"),
+        ("a", "", 2, 2, "bba"),
+        ("a", "c", 2, 2, "cbcba"),
+        ("q", "c", -1, 0, "ababa"),
+    ],
+)
+def test_replace_in_file_reports_replacement_count(
+    file_workspace: Path,
+    old: str,
+    new: str,
+    count: int,
+    expected_count: int,
+    expected_text: str,
+) -> None:
+    (file_workspace / "text.txt").write_text("ababa", encoding="utf-8")
+
+    result = files.replace_in_file("text.txt", old, new, count=count)
+
+    if expected_count:
+        assert result == f"Replaced {expected_count} occurrence(s) in text.txt"
+    else:
+        assert result == "No matches found in text.txt"
+    assert (file_workspace / "text.txt").read_text(encoding="utf-8") == expected_text
+
+
+def test_diff_files_reports_changed_lines(file_workspace: Path) -> None:
+    (file_workspace / "a.txt").write_text("one\ntwo\nthree\n", encoding="utf-8")
+    (file_workspace / "b.txt").write_text("one\n2\nthree\n", encoding="utf-8")
+    (file_workspace / "bad.txt").write_bytes(b"\xff\xfe\x00")
+
+    diff = files.diff_files("a.txt", "b.txt")
+
+    assert diff.startswith("--- a.txt\n+++ b.txt\n")
+    assert "-two\n+2\n" in diff
+    assert files.diff_files("a.txt", "a.txt") == "No differences found."
+    assert files.diff_files("a.txt", "bad.txt") == (
+        "Error: Both files must be UTF-8 text for diff"
+    )
+
+
+def test_zip_paths_stores_precompressed_files(file_workspace: Path) -> None:
+    (file_workspace / "src").mkdir()
+    (file_workspace / "src/notes.txt").write_text("text " * 100, encoding="utf-8")
+    (file_workspace / "src/image.png").write_bytes(b"\x89PNG" + bytes(100))
+
+    result = files.zip_paths(["src"], "out.zip")
+
+    assert result == "Created zip out.zip with 2 file(s)"
+    with ZipFile(file_workspace / "out.zip") as archive:
+        compress_types = {
+            info.filename: info.compress_type for info in archive.infolist()
+        }
+    assert compress_types == {
+        "src/notes.txt": ZIP_DEFLATED,
+        "src/image.png": ZIP_STORED,
+    }
+
+
+def test_zip_prefetch_batches_are_bounded_by_bytes(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(files, "ZIP_PREFETCH_MAX_BYTES", 64)
+    monkeypatch.setattr(files, "ZIP_PREFETCH_BATCH_BYTES", 100)
+    members = [
+        (Path(name), size)
+        for name, size in zip("abcde", [60, 30, 20, 500, 50], strict=True)
+    ]
+
+    batches = list(files._zip_prefetch_batches(members))
+
+    assert batches == [[Path("a"), Path("b")], [Path("c"), Path("d"), Path("e")]]
+
+
+def test_zip_paths_round_trips_prefetched_and_streamed_members(
+    file_workspace: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(files, "ZIP_PREFETCH_MAX_BYTES", 64)
+    (file_workspace / "src").mkdir()
+    (file_workspace / "src/small.txt").write_text("small", encoding="utf-8")
+    (file_workspace / "src/large.txt").write_text("large " * 50, encoding="utf-8")
+
+    assert files.zip_paths(["src"], "out.zip") == "Created zip out.zip with 2 file(s)"
+    assert files.zip_paths(["missing"], "other.zip") == (
+        "Error: Input path 'missing' not found"
+    )
+    assert not (file_workspace / "other.zip").exists()
+
+    assert files.unzip_file("out.zip", "restored").startswith("Extracted 2 file(s)")
+    restored = file_workspace / "restored/src"
+    assert (restored / "small.txt").read_text(encoding="utf-8") == "small"
+    assert (restored / "large.txt").read_text(encoding="utf-8") == "large " * 50
+
+
+@pytest.mark.parametrize("size", [16, 64 * 1024])
+def test_copy_file_copies_bytes_and_metadata(file_workspace: Path, size: int) -> None:
+    payload = bytes(range(256)) * (size // 256 or 1)
+    source = file_workspace / "source.bin"
+    source.write_bytes(payload)
+    os.utime(source, (1_000_000_000, 1_000_000_000))
+
+    result = files.copy_file("source.bin", "nested/copy.bin")
+
+    copied = file_workspace / "nested/copy.bin"
+    assert result == "Copied source.bin -> nested/copy.bin"
+    assert copied.read_bytes() == payload
+    assert copied.stat().st_mtime == source.stat().st_mtime
+    assert files.copy_file("source.bin", "source.bin", overwrite=True).startswith(
+        "Error: Unable to copy file"
+    )
+    assert source.read_bytes() == payload
+
+
+def test_safe_list_files_keeps_empty_files_without_sniffing(
+    file_workspace: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    (file_workspace / "empty.dat").write_bytes(b"")
+    sniffed: list[str] = []
+    monkeypatch.setattr(files, "_is_probably_binary", sniffed.append)
+
+    assert files.safe_list_files(".") == ["empty.dat"]
+    assert sniffed == []
+
+
+def test_search_in_files_accepts_several_queries(file_workspace: Path) -> None:
+    (file_workspace / "a.py").write_text(
+        "import os\nTODO: tidy\nvalue = 1\nFIXME later\n", encoding="utf-8"
+    )
+
+    hits = files.search_in_files(["todo", "fixme"])
+
+    assert [hit["line_number"] for hit in hits] == [2, 4]
+    assert files.search_in_files(["todo", "fixme"], case_sensitive=True) == []
+    assert files.search_in_files(["todo", ""]) == [{"error": "query must not be empty"}]
+
+
+def test_resolve_rejects_symlinks_and_sibling_prefixes(
+    file_workspace: Path, tmp_path_factory: pytest.TempPathFactory
+) -> None:
+    outside = tmp_path_factory.mktemp("outside")
+    (file_workspace / "escape").symlink_to(outside)
+    sibling = file_workspace.with_name(file_workspace.name + "-sibling")
+
+    assert files._resolve_workspace_path(".") == file_workspace
+    for path_value in (
+        "../outside.txt",
+        "escape/secret.txt",
+        str(sibling / "file.txt"),
+    ):
+        with pytest.raises(ValueError, match="outside workspace root"):
+            files._resolve_workspace_path(path_value)
+
+
+def test_compute_file_hash_reuses_digest_until_the_file_changes(
+    file_workspace: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    target = file_workspace / "data.txt"
+    target.write_bytes(b"first")
+    os.utime(target, (1_000_000_000, 1_000_000_000))
+    first = files.compute_file_hash("data.txt")
+
+    def fail_digest(*_: object) -> None:
+        raise AssertionError("cached digest should have been reused")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(hashlib, "file_digest", fail_digest)
+        assert files.compute_file_hash("data.txt") == first
+
+    files.write_file("data.txt", "second")
+    assert files.compute_file_hash("data.txt") == (
+        f"sha256:{hashlib.sha256(b'second').hexdigest()}"
+    )
+
+
+def test_find_files_does_not_descend_into_ignored_dirs(file_workspace: Path) -> None:
+    (file_workspace / "node_modules/pkg").mkdir(parents=True)
+    (file_workspace / "node_modules/pkg/index.js").write_text("", encoding="utf-8")
+    (file_workspace / "app.js").write_text("", encoding="utf-8")
+
+    assert files.find_files("*.js") == ["app.js"]
+
+
+def test_read_file_lines_numbers_the_requested_slice(file_workspace: Path) -> None:
+    (file_workspace / "lines.txt").write_text("a\nb\nc\nd\n", encoding="utf-8")
+
+    assert files.read_file_lines("lines.txt", start=2, end=3) == (
+        "     2\tb\n     3\tc"
+    )
+    assert files.tail_file("lines.txt", n=1) == "     4\td"
+
+
+def test_get_file_info_stats_the_path_once(file_workspace: Path) -> None:
+    (file_workspace / "pkg").mkdir()
+    (file_workspace / "pkg/mod.py").write_text("x = 1\n", encoding="utf-8")
+
+    file_info = files.get_file_info("pkg/mod.py")
+    dir_info = files.get_file_info("pkg")
+
+    assert (file_info["is_file"], file_info["is_dir"]) == (True, False)
+    assert file_info["size_bytes"] == 6
+    assert (dir_info["is_file"], dir_info["is_dir"]) == (False, True)
+    assert files.get_file_info("pkg/mod.py/nested") == {
+        "path": "pkg/mod.py/nested",
+        "exists": False,
+    }
@@ -3,12 +3,14 @@ from types import SimpleNamespace
 from agent.orchestrator import (
     CodingOrchestrator,
     build_project_root,
+    configure_plan_storage,
     derive_project_name,
     merge_task_results,
     partition_tasks,
     resolve_project_target,
 )
 from config import AgentConfig
+from utils import plans
 
 
 def test_partition_tasks_splits_independent_and_dependent() -> None:
@@ -186,3 +188,20 @@ def test_build_deep_agent_registers_shell_tool(monkeypatch) -> None:
     tool_names = [tool.name for tool in captured["tools"]]  # type: ignore[index]
     assert result == {"graph": "ok"}
     assert "run_shell" in tool_names
+
+
+def test_plan_storage_is_configured_at_startup_not_per_orchestrator(
+    monkeypatch,
+) -> None:
+    backend = plans.FilePlanBackend()
+    monkeypatch.setattr(plans, "_BACKEND", backend)
+    monkeypatch.setattr(plans, "RENDER_MARKDOWN_VIEW", True)
+    config = AgentConfig(api_key="stub-openai-key", plan_render_markdown=False)
+
+    CodingOrchestrator(config=config)
+    assert plans._BACKEND is backend
+    assert plans.RENDER_MARKDOWN_VIEW is True
+
+    configure_plan_storage(config)
+    assert plans._BACKEND is backend
+    assert plans.RENDER_MARKDOWN_VIEW is False
@@ -0,0 +1,10 @@
+from utils import plans
+
+
+def test_decompose_task_returns_steps() -> None:
+    steps = plans.decompose_task(
+        "Inspect code then implement plan tools then run tests",
+        max_steps=4,
+    )
+    assert not any(step.startswith("Error:") for step in steps)
+    assert 2 <= len(steps) <= 4
@@ -1,6 +1,12 @@
 import json
+import os
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from pathlib import Path
 
+import pytest
+
+from tools import plan_tools as plan_tools_module
 from tools.plan_tools import make_scoped_plan_tools
 from tools.todo_tools import make_scoped_todo_tools
 from utils import plans
@@ -8,13 +14,7 @@ from utils import plans
 
 def _read_state(plan_file: str) -> dict:
     content = Path(plan_file).read_text(encoding="utf-8")
-    match = plans.STATE_PATTERN.search(content)
-    assert match is not None
-    return json.loads(match.group(1))
-
-
-def _plan_file(name: str) -> str:
-    return f"tmp_plan_{name}.md"
+    return plans._load_state_from_markdown(content)
 
 
 def _tool_by_name(tools: list[object], name: str):
@@ -24,380 +24,750 @@ def _tool_by_name(tools: list[object], name: str):
     raise AssertionError(f"Tool '{name}' not found")
 
 
-def test_create_plan_and_update_step() -> None:
-    plan_file = _plan_file("test_create_update")
-    plan_path = Path(plan_file)
-    try:
-        created = plans.create_plan(
-            task="Implement planning tools",
-            steps=["Inspect code", "Implement changes", "Run checks"],
-            plan_file=plan_file,
-            overwrite=True,
-        )
-        assert created.startswith("Created plan")
-        assert plan_path.exists()
-
-        initial_state = _read_state(plan_file)
-        assert initial_state["steps"][0]["status"] == "in_progress"
-        assert initial_state["status"] == "active"
-
-        updated = plans.update_plan(
-            step_number=1,
-            status="completed",
-            note="Finished repository scan",
-            plan_file=plan_file,
-        )
-        assert updated.startswith("Updated step 1")
-
-        state = _read_state(plan_file)
-        assert state["steps"][0]["status"] == "completed"
-        assert any(
-            entry["message"] == "Finished repository scan"
-            for entry in state["progress_log"]
-        )
-    finally:
-        if plan_path.exists():
-            try:
-                plan_path.unlink()
-            except PermissionError:
-                pass
+@dataclass(frozen=True)
+class LifecycleStep:
+    """One plan mutation, its expected result prefix, and an optional check."""
 
+    action: Callable[[str], str]
+    expected_prefix: str
+    check: Callable[[dict | None], None] | None = None
 
-def test_set_subgoals_replace_and_append() -> None:
-    plan_file = _plan_file("test_subgoals")
-    plan_path = Path(plan_file)
-    try:
-        plans.create_plan(
+
+@dataclass(frozen=True)
+class PlanLifecycleCase:
+    """A create-then-mutate plan scenario run through one shared test body."""
+
+    task: str
+    steps: list[str]
+    mutations: list[LifecycleStep] = field(default_factory=list)
+
+
+def _check_update_completed(state: dict | None) -> None:
+    assert state is not None
+    assert state["steps"][0]["status"] == "completed"
+    assert any(
+        entry["message"] == "Finished repository scan"
+        for entry in state["progress_log"]
+    )
+
+
+def _check_three_subgoals(state: dict | None) -> None:
+    assert state is not None
+    descriptions = [item["description"] for item in state["subgoals"]]
+    assert descriptions == ["Code quality", "Add tests", "Document usage"]
+
+
+def _check_half_progress(state: dict | None) -> None:
+    assert state is not None
+    assert state["percent_complete"] == 50
+    assert state["status"] == "active"
+
+
+def _check_one_reflection(state: dict | None) -> None:
+    assert state is not None
+    assert len(state["reflections"]) == 1
+
+
+def _check_removed(state: dict | None) -> None:
+    assert state is None
+
+
+LIFECYCLE_CASES = [
+    pytest.param(
+        PlanLifecycleCase(
+            task="Implement planning tools",
+            steps=["Inspect code", "Implement changes", "Run checks"],
+            mutations=[
+                LifecycleStep(
+                    lambda plan_file: plans.update_plan(
+                        step_number=1,
+                        status="completed",
+                        note="Finished repository scan",
+                        plan_file=plan_file,
+                    ),
+                    "Updated step 1",
+                    _check_update_completed,
+                ),
+            ],
+        ),
+        id="create_and_update_step",
+    ),
+    pytest.param(
+        PlanLifecycleCase(
             task="Test subgoals",
             steps=["Step A"],
-            plan_file=plan_file,
-            overwrite=True,
-        )
-
-        replaced = plans.set_subgoals(
-            subgoals=["Code quality", "Add tests"],
-            plan_file=plan_file,
-            replace=True,
-        )
-        assert replaced.startswith("Set 2 subgoal")
-
-        appended = plans.set_subgoals(
-            subgoals=["Document usage"],
-            plan_file=plan_file,
-            replace=False,
-        )
-        assert appended.startswith("Updated 3 subgoal")
-
-        state = _read_state(plan_file)
-        descriptions = [item["description"] for item in state["subgoals"]]
-        assert descriptions == ["Code quality", "Add tests", "Document usage"]
-    finally:
-        if plan_path.exists():
-            try:
-                plan_path.unlink()
-            except PermissionError:
-                pass
+            mutations=[
+                LifecycleStep(
+                    lambda plan_file: plans.set_subgoals(
+                        subgoals=["Code quality", "Add tests"],
+                        plan_file=plan_file,
+                        replace=True,
+                    ),
+                    "Set 2 subgoal",
+                ),
+                LifecycleStep(
+                    lambda plan_file: plans.set_subgoals(
+                        subgoals=["Document usage"],
+                        plan_file=plan_file,
+                        replace=False,
+                    ),
+                    "Updated 3 subgoal",
+                    _check_three_subgoals,
+                ),
+            ],
+        ),
+        id="set_subgoals_replace_and_append",
+    ),
+    pytest.param(
+        PlanLifecycleCase(
+            task="Finalize workflow",
+            steps=["Only step"],
+            mutations=[
+                LifecycleStep(
+                    lambda plan_file: plans.track_progress(
+                        message="Half complete",
+                        percent_complete=50,
+                        plan_file=plan_file,
+                    ),
+                    "Logged progress",
+                    _check_half_progress,
+                ),
+                LifecycleStep(
+                    lambda plan_file: plans.track_progress(
+                        message="Done",
+                        complete_plan=True,
+                        cleanup_plan_file=True,
+                        plan_file=plan_file,
+                    ),
+                    "Completed plan and removed",
+                    _check_removed,
+                ),
+            ],
+        ),
+        id="track_progress_complete_and_cleanup",
+    ),
+    pytest.param(
+        PlanLifecycleCase(
+            task="Reflection path",
+            steps=["Plan", "Build"],
+            mutations=[
+                LifecycleStep(
+                    lambda plan_file: plans.reflect_on_plan(
+                        summary="Execution looks stable",
+                        risks=["Low test coverage"],
+                        next_actions=["Add integration test"],
+                        plan_file=plan_file,
+                    ),
+                    "Recorded reflection",
+                    _check_one_reflection,
+                ),
+                LifecycleStep(
+                    lambda plan_file: plans.reflect_on_plan(
+                        summary="All work completed",
+                        finalize=True,
+                        cleanup_plan_file=True,
+                        plan_file=plan_file,
+                    ),
+                    "Completed plan and removed",
+                    _check_removed,
+                ),
+            ],
+        ),
+        id="reflect_on_plan_finalize_and_cleanup",
+    ),
+]
+
+
+@pytest.mark.parametrize("case", LIFECYCLE_CASES)
+def test_plan_lifecycle(
+    case: PlanLifecycleCase,
+    plan_file: str,
+    memory_plan_backend: plans.MemoryPlanBackend,
+) -> None:
+    plan_path = Path(plan_file)
+    created = plans.create_plan(
+        task=case.task,
+        steps=case.steps,
+        plan_file=plan_file,
+        overwrite=True,
+    )
+    assert created.startswith("Created plan")
+
+    initial_state = memory_plan_backend.load(plan_path)
+    assert initial_state["steps"][0]["status"] == "in_progress"
+    assert initial_state["status"] == "active"
+
+    for step in case.mutations:
+        result = step.action(plan_file)
+        assert result.startswith(step.expected_prefix)
+        if step.check is not None:
+            state = (
+                memory_plan_backend.load(plan_path)
+                if memory_plan_backend.exists(plan_path)
+                else None
+            )
+            step.check(state)
+
+
+@pytest.mark.parametrize(
+    "case",
+    [param for param in LIFECYCLE_CASES if param.id.endswith("_cleanup")],
+)
+def test_plan_lifecycle_cleanup_removes_the_file_on_disk(
+    case: PlanLifecycleCase, plan_file: str
+) -> None:
+    plans.create_plan(task=case.task, steps=case.steps, plan_file=plan_file)
+    assert Path(plan_file).exists()
+
+    for step in case.mutations:
+        assert step.action(plan_file).startswith(step.expected_prefix)
+
+    assert not Path(plan_file).exists()
+
+
+def test_track_progress_invalid_cleanup_does_not_persist_progress(
+    seeded_plan_file: str,
+) -> None:
+    plan_file = seeded_plan_file
+    initial_state = _read_state(plan_file)
+    initial_log_len = len(initial_state["progress_log"])
+
+    result = plans.track_progress(
+        message="Should not persist",
+        cleanup_plan_file=True,
+        plan_file=plan_file,
+    )
+    assert result == "Error: cleanup_plan_file requires a completed plan"
+
+    state_after = _read_state(plan_file)
+    assert len(state_after["progress_log"]) == initial_log_len
+    assert not any(
+        entry["message"] == "Should not persist"
+        for entry in state_after["progress_log"]
+    )
+
+
+def test_reflect_on_plan_invalid_cleanup_does_not_persist_reflection(
+    seeded_plan_file: str,
+) -> None:
+    plan_file = seeded_plan_file
+    initial_state = _read_state(plan_file)
+    assert len(initial_state["reflections"]) == 0
+
+    result = plans.reflect_on_plan(
+        summary="Should not persist",
+        cleanup_plan_file=True,
+        plan_file=plan_file,
+    )
+    assert result == "Error: cleanup_plan_file requires a completed plan"
+
+    state_after = _read_state(plan_file)
+    assert len(state_after["reflections"]) == 0
+
+
+def test_file_backend_yields_to_markdown_edits(plan_file: str) -> None:
+    plans.create_plan(
+        task="Hand edits",
+        steps=["Step one", "Step two"],
+        plan_file=plan_file,
+        overwrite=True,
+    )
+
+    edited = _read_state(plan_file)
+    edited["task"] = "Edited by hand"
+    Path(plan_file).write_text(plans._serialize_markdown(edited), encoding="utf-8")
+
+    state = plans.FilePlanBackend().load(Path(plan_file))
+    assert state["task"] == "Edited by hand"
+
+    plans.track_progress(
+        message="Done",
+        complete_plan=True,
+        cleanup_plan_file=True,
+        plan_file=plan_file,
+    )
+    assert not Path(plan_file).exists()
 
 
-def test_track_progress_complete_and_cleanup() -> None:
-    plan_file = _plan_file("test_progress_cleanup")
+def test_file_backend_serves_unchanged_plans_from_memory(
+    plan_file: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    backend = plans.FilePlanBackend()
     plan_path = Path(plan_file)
-    try:
-        plans.create_plan(
-            task="Finalize workflow",
-            steps=["Only step"],
-            plan_file=plan_file,
-            overwrite=True,
-        )
-
-        progress = plans.track_progress(
-            message="Half complete",
-            percent_complete=50,
-            plan_file=plan_file,
-        )
-        assert progress.startswith("Logged progress")
-
-        state = _read_state(plan_file)
-        assert state["percent_complete"] == 50
-        assert state["status"] == "active"
-
-        cleanup = plans.track_progress(
-            message="Done",
-            complete_plan=True,
-            cleanup_plan_file=True,
-            plan_file=plan_file,
-        )
-        assert cleanup.startswith("Completed plan and removed") or cleanup.startswith(
-            "Warning: Plan completed but cleanup failed"
-        )
-        if plan_path.exists():
-            state_after_cleanup = _read_state(plan_file)
-            assert state_after_cleanup["status"] == "completed"
-        else:
-            assert not plan_path.exists()
-    finally:
-        if plan_path.exists():
-            try:
-                plan_path.unlink()
-            except PermissionError:
-                pass
+    backend.save(plan_path, plans._coerce_state({"task": "Cached", "steps": ["A"]}))
+    os.utime(plan_path, ns=(1_000_000_000, 1_000_000_000))
+    backend.load(plan_path)
 
+    def fail_read(_: Path) -> None:
+        raise AssertionError("unchanged plan should not be re-read")
 
-def test_track_progress_invalid_cleanup_does_not_persist_progress() -> None:
-    plan_file = _plan_file("test_progress_invalid_cleanup")
+    with monkeypatch.context() as patch:
+        patch.setattr(plans, "_load_state_from_markdown", fail_read)
+        first = backend.load(plan_path)
+        first["steps"][0]["status"] = "completed"
+        assert backend.load(plan_path)["steps"][0]["status"] == "pending"
+
+    edited = backend.load(plan_path)
+    edited["task"] = "Edited by hand"
+    plan_path.write_text(plans._serialize_markdown(edited), encoding="utf-8")
+    assert backend.load(plan_path)["task"] == "Edited by hand"
+
+
+def test_file_backend_hits_the_cache_once_the_racy_window_passes(
+    plan_file: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    backend = plans.FilePlanBackend()
     plan_path = Path(plan_file)
-    try:
-        plans.create_plan(
-            task="Invalid cleanup progress",
-            steps=["Step one", "Step two"],
-            plan_file=plan_file,
-            overwrite=True,
-        )
-        initial_state = _read_state(plan_file)
-        initial_log_len = len(initial_state["progress_log"])
-
-        result = plans.track_progress(
-            message="Should not persist",
-            cleanup_plan_file=True,
-            plan_file=plan_file,
-        )
-        assert result == "Error: cleanup_plan_file requires a completed plan"
-
-        state_after = _read_state(plan_file)
-        assert len(state_after["progress_log"]) == initial_log_len
-        assert not any(
-            entry["message"] == "Should not persist"
-            for entry in state_after["progress_log"]
-        )
-    finally:
-        if plan_path.exists():
-            try:
-                plan_path.unlink()
-            except PermissionError:
-                pass
+    backend.save(plan_path, plans._coerce_state({"task": "Cached", "steps": ["A"]}))
+    parses: list[str] = []
+    parse = plans._load_state_from_markdown
+
+    def counting_parse(content: str) -> dict:
+        parses.append(content)
+        return parse(content)
+
+    monkeypatch.setattr(plans, "_load_state_from_markdown", counting_parse)
+    backend.load(plan_path)
+    backend.load(plan_path)
+    assert len(parses) == 2
+
+    later = plan_path.stat().st_mtime_ns + plans.PLAN_CACHE_RACY_NS + 1
+    monkeypatch.setattr(plans.time, "time_ns", lambda: later)
+    assert backend.load(plan_path)["task"] == "Cached"
+    assert backend.load(plan_path)["task"] == "Cached"
+    assert len(parses) == 2
+
+
+def test_file_backend_rereads_plans_modified_within_the_racy_window(
+    plan_file: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Model a filesystem whose ctime also stays inside one coarse tick.
+    monkeypatch.setattr(
+        plans,
+        "_stat_fingerprint",
+        lambda stats: (stats.st_ino, stats.st_size, stats.st_mtime_ns, 0),
+    )
+    backend = plans.FilePlanBackend()
+    plan_path = Path(plan_file)
+    backend.save(plan_path, plans._coerce_state({"task": "Task A", "steps": ["A"]}))
+    assert backend.load(plan_path)["task"] == "Task A"
+    stats = plan_path.stat()
+
+    # Same size, same mtime: only the racy-window rule can notice this edit.
+    content = plan_path.read_text(encoding="utf-8").replace("Task A", "Task B")
+    plan_path.write_text(content, encoding="utf-8")
+    os.utime(plan_path, ns=(stats.st_atime_ns, stats.st_mtime_ns))
 
+    assert backend.load(plan_path)["task"] == "Task B"
 
-def test_reflect_on_plan_finalize_and_cleanup() -> None:
-    plan_file = _plan_file("test_reflection_cleanup")
+
+def test_file_backend_save_replaces_plan_atomically(plan_file: str) -> None:
+    plans.create_plan(task="Atomic save", steps=["Step one"], plan_file=plan_file)
     plan_path = Path(plan_file)
-    try:
-        plans.create_plan(
-            task="Reflection path",
-            steps=["Plan", "Build"],
-            plan_file=plan_file,
-            overwrite=True,
-        )
-
-        reflection = plans.reflect_on_plan(
-            summary="Execution looks stable",
-            risks=["Low test coverage"],
-            next_actions=["Add integration test"],
-            plan_file=plan_file,
-        )
-        assert reflection.startswith("Recorded reflection")
-
-        state = _read_state(plan_file)
-        assert len(state["reflections"]) == 1
-
-        finalized = plans.reflect_on_plan(
-            summary="All work completed",
-            finalize=True,
-            cleanup_plan_file=True,
-            plan_file=plan_file,
-        )
-        assert finalized.startswith(
-            "Completed plan and removed"
-        ) or finalized.startswith("Warning: Plan completed but cleanup failed")
-        if plan_path.exists():
-            finalized_state = _read_state(plan_file)
-            assert finalized_state["status"] == "completed"
-        else:
-            assert not plan_path.exists()
-    finally:
-        if plan_path.exists():
-            try:
-                plan_path.unlink()
-            except PermissionError:
-                pass
+    original_inode = plan_path.stat().st_ino
+
+    plans.track_progress(message="Rewritten", plan_file=plan_file)
+
+    assert plan_path.stat().st_ino != original_inode
+    assert [path.name for path in plan_path.parent.iterdir()] == ["plan.md"]
 
 
-def test_reflect_on_plan_invalid_cleanup_does_not_persist_reflection() -> None:
-    plan_file = _plan_file("test_reflection_invalid_cleanup")
+def test_file_backend_save_keeps_permissions_and_symlinks(
+    plan_file: str, plan_workspace: Path
+) -> None:
     plan_path = Path(plan_file)
-    try:
-        plans.create_plan(
-            task="Invalid cleanup reflection",
-            steps=["Step one", "Step two"],
-            plan_file=plan_file,
-            overwrite=True,
-        )
-        initial_state = _read_state(plan_file)
-        assert len(initial_state["reflections"]) == 0
-
-        result = plans.reflect_on_plan(
-            summary="Should not persist",
-            cleanup_plan_file=True,
-            plan_file=plan_file,
-        )
-        assert result == "Error: cleanup_plan_file requires a completed plan"
-
-        state_after = _read_state(plan_file)
-        assert len(state_after["reflections"]) == 0
-    finally:
-        if plan_path.exists():
-            try:
-                plan_path.unlink()
-            except PermissionError:
-                pass
+    plans.create_plan(task="Modes", steps=["Step one"], plan_file=plan_file)
+    plan_path.chmod(0o640)
+
+    plans.track_progress(message="Rewritten", plan_file=plan_file)
+    assert plan_path.stat().st_mode & 0o777 == 0o640
+
+    link = plan_workspace / "link.md"
+    link.symlink_to(plan_path)
+    plans.track_progress(message="Through the link", plan_file=str(link))
+    assert link.is_symlink()
+    assert _read_state(plan_file)["progress_log"][-1]["message"] == "Through the link"
+
+    with pytest.raises(OSError, match="symlink"):
+        plans._atomic_write_text(link, "replaced")
+    assert link.is_symlink()
+
+
+def test_file_backend_can_skip_markdown_rendering(
+    plan_file: str, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(plans, "RENDER_MARKDOWN_VIEW", True)
+    monkeypatch.setattr(plans, "_BACKEND", plans.FilePlanBackend())
+    plans.configure_backend("file", render_markdown=False)
+    plans.create_plan(task="Headless run", steps=["Step one"], plan_file=plan_file)
+
+    content = Path(plan_file).read_text(encoding="utf-8")
+    assert content.startswith(plans.STATE_START)
+    assert "## Steps" not in content
+    assert plans.FilePlanBackend().load(Path(plan_file))["task"] == "Headless run"
 
 
-def test_decompose_task_returns_steps() -> None:
-    steps = plans.decompose_task(
-        "Inspect code then implement plan tools then run tests",
-        max_steps=4,
+def test_markdown_state_loader_ignores_marker_text_inside_task(
+    plan_file: str,
+) -> None:
+    task = f"Document the {plans.STATE_START} marker\n```json\n{{}}"
+    plans.create_plan(task=task, steps=["Step one"], plan_file=plan_file)
+
+    assert _read_state(plan_file)["task"] == task.strip()
+
+
+def test_verify_plan_file_creates_when_missing(plan_file: str) -> None:
+    result = plans.verify_plan_file(
+        task="Build endpoint and tests",
+        plan_file=plan_file,
     )
-    assert not any(step.startswith("Error:") for step in steps)
-    assert 2 <= len(steps) <= 4
+    assert result.startswith("Verified plan file by creating")
+    assert Path(plan_file).exists()
 
+    state = _read_state(plan_file)
+    assert state["task"] == "Build endpoint and tests"
+    assert len(state["steps"]) >= 2
 
-def test_verify_plan_file_creates_when_missing() -> None:
-    plan_file = _plan_file("verify_create")
-    plan_path = Path(plan_file)
-    try:
-        if plan_path.exists():
-            plan_path.unlink()
-
-        result = plans.verify_plan_file(
-            task="Build endpoint and tests",
-            plan_file=plan_file,
-        )
-        assert result.startswith("Verified plan file by creating")
-        assert plan_path.exists()
-
-        state = _read_state(plan_file)
-        assert state["task"] == "Build endpoint and tests"
-        assert len(state["steps"]) >= 2
-    finally:
-        if plan_path.exists():
-            try:
-                plan_path.unlink()
-            except PermissionError:
-                pass
 
+def test_verify_plan_file_repairs_corrupted_state(plan_file: str) -> None:
+    Path(plan_file).write_text("# Corrupted file\nmissing markers", encoding="utf-8")
 
-def test_verify_plan_file_repairs_corrupted_state() -> None:
-    plan_file = _plan_file("verify_repair_corrupt")
-    plan_path = Path(plan_file)
-    try:
-        plan_path.write_text("# Corrupted file\nmissing markers", encoding="utf-8")
+    result = plans.verify_plan_file(
+        task="Repair this plan",
+        plan_file=plan_file,
+    )
+    assert result.startswith("Verified plan file by recreating corrupted content")
 
-        result = plans.verify_plan_file(
-            task="Repair this plan",
-            plan_file=plan_file,
-        )
-        assert result.startswith("Verified plan file by recreating corrupted content")
+    state = _read_state(plan_file)
+    assert state["task"] == "Repair this plan"
+    assert state["status"] == "active"
 
-        state = _read_state(plan_file)
-        assert state["task"] == "Repair this plan"
-        assert state["status"] == "active"
-    finally:
-        if plan_path.exists():
-            try:
-                plan_path.unlink()
-            except PermissionError:
-                pass
 
+def test_verify_plan_file_syncs_task_when_request_changes(plan_file: str) -> None:
+    plans.create_plan(
+        task="Old request",
+        steps=["Old step 1", "Old step 2"],
+        plan_file=plan_file,
+        overwrite=True,
+    )
+
+    result = plans.verify_plan_file(
+        task="New request",
+        plan_file=plan_file,
+    )
+    assert result.startswith("Verified plan file by syncing task")
+
+    state = _read_state(plan_file)
+    assert state["task"] == "New request"
+    assert state["steps"][0]["status"] == "in_progress"
+
+
+def test_verify_plan_file_normalizes_inconsistent_status(plan_file: str) -> None:
+    plans.create_plan(
+        task="Normalize status",
+        steps=["Step 1", "Step 2"],
+        plan_file=plan_file,
+        overwrite=True,
+    )
+
+    state = _read_state(plan_file)
+    state["status"] = "completed"
+    state["percent_complete"] = 100
+    Path(plan_file).write_text(plans._serialize_markdown(state), encoding="utf-8")
+
+    result = plans.verify_plan_file(
+        task="Normalize status",
+        plan_file=plan_file,
+    )
+    assert result.startswith("Verified plan file and applied updates")
+
+    normalized_state = _read_state(plan_file)
+    assert normalized_state["status"] == "active"
+    assert normalized_state["percent_complete"] < 100
+    assert any(
+        "Plan auto-verified before run and updated" in entry["message"]
+        for entry in normalized_state["progress_log"]
+    )
+
+
+def test_scoped_plan_and_todo_tools_use_bound_plan_file(plan_file: str) -> None:
+    plan_tools = make_scoped_plan_tools(plan_file)
+    todo_tools = make_scoped_todo_tools(plan_file)
+
+    create_plan_tool = _tool_by_name(plan_tools, "create_plan")
+    create_result = create_plan_tool.invoke(
+        {
+            "task": "Scoped tool task",
+            "steps": ["Inspect code", "Ship fix"],
+            "overwrite": True,
+        }
+    )
+    assert create_result.startswith("Created plan")
+    assert Path(plan_file).exists()
+
+    overview_tool = _tool_by_name(todo_tools, "get_plan_overview")
+    overview = overview_tool.invoke({})
+    assert overview["task"] == "Scoped tool task"
+    assert overview["num_steps"] == 2
+
+
+def test_todo_tools_read_plans_through_the_active_backend(
+    plan_file: str, memory_plan_backend: plans.MemoryPlanBackend
+) -> None:
+    plans.create_plan(task="In memory", steps=["A", "B"], plan_file=plan_file)
+    plans.update_plan(step_number=1, status="completed", plan_file=plan_file)
+    todo_tools = make_scoped_todo_tools(plan_file)
+
+    overview = _tool_by_name(todo_tools, "get_plan_overview").invoke({})
+    open_steps = _tool_by_name(todo_tools, "get_open_steps").invoke({})
+
+    assert not Path(plan_file).exists()
+    assert overview["task"] == "In memory"
+    assert overview["percent_complete"] == 50
+    assert [step["id"] for step in open_steps] == [2]
+
+
+def test_todo_tools_report_why_a_plan_could_not_be_loaded(plan_file: str) -> None:
+    overview = _tool_by_name(make_scoped_todo_tools(plan_file), "get_plan_overview")
+
+    assert overview.invoke({}) == {"error": f"Error: Plan file '{plan_file}' not found"}
+    assert plans.load_plan_state(plan_file) == (
+        None,
+        f"Error: Plan file '{plan_file}' not found",
+    )
+
+
+def test_module_level_plan_tools_are_wrapped_lazily_and_cached() -> None:
+    update_tool = plan_tools_module.update_plan
+    assert update_tool.name == "update_plan"
+    assert plan_tools_module.update_plan is update_tool
+    assert vars(plan_tools_module)["update_plan"] is update_tool
 
-def test_verify_plan_file_syncs_task_when_request_changes() -> None:
-    plan_file = _plan_file("verify_sync_task")
-    plan_path = Path(plan_file)
-    try:
-        plans.create_plan(
-            task="Old request",
-            steps=["Old step 1", "Old step 2"],
-            plan_file=plan_file,
-            overwrite=True,
-        )
-
-        result = plans.verify_plan_file(
-            task="New request",
-            plan_file=plan_file,
-        )
-        assert result.startswith("Verified plan file by syncing task")
-
-        state = _read_state(plan_file)
-        assert state["task"] == "New request"
-        assert state["steps"][0]["status"] == "in_progress"
-    finally:
-        if plan_path.exists():
-            try:
-                plan_path.unlink()
-            except PermissionError:
-                pass
 
+def test_plan_paths_outside_workspace_are_rejected(plan_workspace: Path) -> None:
+    sibling = plan_workspace.with_name(plan_workspace.name + "-other")
+
+    for plan_file in ("../plan.md", str(sibling / "plan.md")):
+        result = plans.create_plan(task="Escape", steps=["A"], plan_file=plan_file)
+        assert result.startswith("Error: Path ")
+        assert "is outside workspace root" in result
+
+
+def test_plan_paths_are_rechecked_after_a_symlink_swap(
+    plan_workspace: Path, tmp_path_factory: pytest.TempPathFactory
+) -> None:
+    outside = tmp_path_factory.mktemp("outside")
+    (plan_workspace / "data").mkdir()
+    plans.create_plan(task="Inside", steps=["A"], plan_file="data/plan.md")
+
+    for entry in (plan_workspace / "data").iterdir():
+        entry.unlink()
+    (plan_workspace / "data").rmdir()
+    (plan_workspace / "data").symlink_to(outside)
+
+    result = plans.create_plan(
+        task="Escape", steps=["A"], plan_file="data/plan.md", overwrite=True
+    )
+    assert "is outside workspace root" in result
+    assert list(outside.iterdir()) == []
+
+
+def test_markdown_state_loader_uses_the_trailing_block() -> None:
+    state = plans._coerce_state({"task": "Real", "steps": ["A"]})
+    decoy = plans._serialize_markdown(plans._coerce_state({"task": "Decoy"}))
+    hand_edited = (
+        decoy
+        + "\n"
+        + plans._serialize_markdown(state).replace("```json\n", "```json  \n\n")
+    )
+
+    assert plans._load_state_from_markdown(hand_edited)["task"] == "Real"
+    for broken in ("no markers", hand_edited.replace("```json", "```yaml")):
+        with pytest.raises(ValueError, match="missing embedded JSON state markers"):
+            plans._load_state_from_markdown(broken)
+
+
+def test_coerce_item_list_renumbers_after_dropping_invalid_items() -> None:
+    items = plans._coerce_item_list(
+        [
+            {"id": 7, "description": "First", "status": "completed"},
+            "  ",
+            {"description": "Second", "status": "unknown"},
+            "Third",
+        ]
+    )
+
+    assert items == [
+        {"id": 1, "description": "First", "status": "completed"},
+        {"id": 2, "description": "Second", "status": "pending"},
+        {"id": 3, "description": "Third", "status": "pending"},
+    ]
+
+
+def test_set_subgoals_append_skips_existing_and_keeps_status(
+    plan_file: str, memory_plan_backend: plans.MemoryPlanBackend
+) -> None:
+    plans.create_plan(task="Merge subgoals", steps=["Only step"], plan_file=plan_file)
+    plans.set_subgoals(subgoals=["Lint", "Docs"], plan_file=plan_file)
+    state = memory_plan_backend.load(Path(plan_file))
+    state["subgoals"][1]["status"] = "completed"
+    memory_plan_backend.save(Path(plan_file), state)
+
+    result = plans.set_subgoals(
+        subgoals=["Docs", "Tests", "Lint"], plan_file=plan_file, replace=False
+    )
+
+    assert result.startswith("Updated 3 subgoal")
+    subgoals = memory_plan_backend.load(Path(plan_file))["subgoals"]
+    assert [(item["description"], item["status"]) for item in subgoals] == [
+        ("Lint", "pending"),
+        ("Docs", "completed"),
+        ("Tests", "pending"),
+    ]
+
+
+def test_update_plan_batch_applies_updates_with_one_save(
+    plan_file: str,
+    memory_plan_backend: plans.MemoryPlanBackend,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    plans.create_plan(task="Batch", steps=["A", "B", "C"], plan_file=plan_file)
+    saves: list[Path] = []
+    save = memory_plan_backend.save
+    monkeypatch.setattr(
+        memory_plan_backend,
+        "save",
+        lambda path, state: (saves.append(path), save(path, state)),
+    )
+
+    result = plans.update_plan_batch(
+        [
+            {"step_number": 1, "status": "completed", "note": "A done"},
+            {"step_number": 2, "status": "completed"},
+            {"step_number": 3, "status": "in_progress"},
+        ],
+        plan_file=plan_file,
+    )
+
+    assert result.startswith("Updated 3 step(s)")
+    assert saves == [Path(plan_file)]
+    state = memory_plan_backend.load(Path(plan_file))
+    assert [item["status"] for item in state["steps"]] == [
+        "completed",
+        "completed",
+        "in_progress",
+    ]
+    assert state["percent_complete"] == 67
+    assert state["progress_log"][-1]["message"] == "A done"
+
+
+def test_update_plan_batch_rejects_invalid_update_without_saving(
+    plan_file: str, memory_plan_backend: plans.MemoryPlanBackend
+) -> None:
+    plans.create_plan(task="Batch", steps=["A", "B"], plan_file=plan_file)
+    before = memory_plan_backend.load(Path(plan_file))
+
+    result = plans.update_plan_batch(
+        [
+            {"step_number": 1, "status": "completed"},
+            {"step_number": 3, "status": "completed"},
+        ],
+        plan_file=plan_file,
+    )
+
+    assert result == "Error: step_number 3 is out of range (1..2)"
+    assert memory_plan_backend.load(Path(plan_file)) == before
+
+
+def test_update_plan_batch_rejects_boolean_step_numbers(
+    plan_file: str, memory_plan_backend: plans.MemoryPlanBackend
+) -> None:
+    plans.create_plan(task="Batch", steps=["A", "B"], plan_file=plan_file)
+    before = memory_plan_backend.load(Path(plan_file))
+
+    result = plans.update_plan_batch(
+        [{"step_number": True, "status": "completed"}], plan_file=plan_file
+    )
+
+    assert result == "Error: update 1 needs an integer step_number and a status"
+    assert memory_plan_backend.load(Path(plan_file)) == before
+
+
+def test_sqlite_backend_persists_plans_and_exports_markdown(
+    plan_file: str, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    backend = plans.SqlitePlanBackend(tmp_path / "plans.db")
+    monkeypatch.setattr(plans, "_BACKEND", backend)
+    plans.create_plan(task="Stored in SQLite", steps=["A", "B"], plan_file=plan_file)
+    plans.update_plan(step_number=1, status="completed", plan_file=plan_file)
+    backend.close()
 
-def test_verify_plan_file_normalizes_inconsistent_status() -> None:
-    plan_file = _plan_file("verify_normalize")
     plan_path = Path(plan_file)
+    assert not plan_path.exists()
+    reopened = plans.SqlitePlanBackend(tmp_path / "plans.db")
     try:
-        plans.create_plan(
-            task="Normalize status",
-            steps=["Step 1", "Step 2"],
-            plan_file=plan_file,
-            overwrite=True,
-        )
-
-        state = _read_state(plan_file)
-        state["status"] = "completed"
-        state["percent_complete"] = 100
-        plan_path.write_text(plans._serialize_markdown(state), encoding="utf-8")
-
-        result = plans.verify_plan_file(
-            task="Normalize status",
-            plan_file=plan_file,
-        )
-        assert result.startswith("Verified plan file and applied updates")
-
-        normalized_state = _read_state(plan_file)
-        assert normalized_state["status"] == "active"
-        assert normalized_state["percent_complete"] < 100
-        assert any(
-            "Plan auto-verified before run and updated" in entry["message"]
-            for entry in normalized_state["progress_log"]
-        )
+        state = reopened.load(plan_path)
+        assert state["task"] == "Stored in SQLite"
+        assert state["percent_complete"] == 50
+
+        reopened.export_markdown(plan_path)
+        assert _read_state(plan_file) == state
+
+        reopened.delete(plan_path)
+        assert not reopened.exists(plan_path)
     finally:
-        if plan_path.exists():
-            try:
-                plan_path.unlink()
-            except PermissionError:
-                pass
+        reopened.close()
 
 
-def test_scoped_plan_and_todo_tools_use_bound_plan_file() -> None:
-    plan_file = _plan_file("scoped_tools")
-    plan_path = Path(plan_file)
+def test_configure_backend_switches_between_file_and_sqlite(
+    plan_file: str, plan_workspace: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(plans, "_BACKEND", plans.FilePlanBackend())
+    plans.configure_backend("sqlite", "state/plans.db")
+    backend = plans._BACKEND
     try:
-        plan_tools = make_scoped_plan_tools(plan_file)
-        todo_tools = make_scoped_todo_tools(plan_file)
-
-        create_plan_tool = _tool_by_name(plan_tools, "create_plan")
-        create_result = create_plan_tool.invoke(
-            {
-                "task": "Scoped tool task",
-                "steps": ["Inspect code", "Ship fix"],
-                "overwrite": True,
-            }
-        )
-        assert create_result.startswith("Created plan")
-        assert plan_path.exists()
-
-        overview_tool = _tool_by_name(todo_tools, "get_plan_overview")
-        overview = overview_tool.invoke({})
-        assert overview["task"] == "Scoped tool task"
-        assert overview["num_steps"] == 2
+        assert isinstance(backend, plans.SqlitePlanBackend)
+        assert backend.db_path == plan_workspace / "state" / "plans.db"
+        plans.configure_backend("sqlite", "state/plans.db")
+        assert plans._BACKEND is backend
+
+        plans.create_plan(task="Configured", steps=["A"], plan_file=plan_file)
+        overview = make_scoped_todo_tools(plan_file)[0].invoke({})
+        assert overview["task"] == "Configured"
+        assert not Path(plan_file).exists()
     finally:
-        if plan_path.exists():
-            try:
-                plan_path.unlink()
-            except PermissionError:
-                pass
+        plans.configure_backend("file")
+    assert isinstance(plans._BACKEND, plans.FilePlanBackend)
+
+    monkeypatch.setattr(plans, "RENDER_MARKDOWN_VIEW", True)
+    with pytest.raises(ValueError, match="Unknown plan backend"):
+        plans.configure_backend("redis", render_markdown=False)
+    assert plans.RENDER_MARKDOWN_VIEW is True
+
+
+@pytest.mark.parametrize(
+    ("raw", "expected"),
+    [
+        (0, 0),
+        (55, 55),
+        (100, 100),
+        (-1, None),
+        (101, None),
+        (50.0, None),
+        ("5", None),
+        (True, None),
+    ],
+)
+def test_coerce_state_keeps_only_in_range_integer_percent(
+    raw: object, expected: int | None
+) -> None:
+    state = plans._coerce_state({"task": "Percent", "percent_complete": raw})
+    assert state["percent_complete"] == expected
+
+
+def test_embedded_state_block_stays_indented_for_readers(plan_file: str) -> None:
+    plans.create_plan(task="Readable", steps=["A", "B"], plan_file=plan_file)
+
+    content = Path(plan_file).read_text(encoding="utf-8")
+    state = _read_state(plan_file)
+    assert json.dumps(state, indent=2, sort_keys=True) in content
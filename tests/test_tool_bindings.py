@@ -0,0 +1,16 @@
+import inspect
+
+import pytest
+
+from tools import file_tools, plan_tools
+
+
+@pytest.mark.parametrize("module", [file_tools, plan_tools], ids=["file", "plan"])
+def test_module_tools_expose_schema_without_docstring_parsing(module) -> None:
+    for name, description in module._TOOL_SPECS:
+        bound = getattr(module, name)
+        assert bound.name == name
+        assert bound.description == description
+        assert bound.args_schema is not None
+        expected = set(inspect.signature(module._OPS[name]).parameters)
+        assert set(bound.args) == expected
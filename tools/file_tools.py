@@ -1,10 +1,13 @@
 """LangChain tool bindings for filesystem operations.
 
 All concrete file logic lives in `utils/files.py`. This module only exposes
-those functions as `@tool` instances with detailed descriptions.
+those functions as `@tool` instances with detailed descriptions. Tools are
+wrapped lazily on first attribute access so importers only pay the
+langchain import and schema construction for the tools they actually use.
 """
 
-from langchain_core.tools import tool
+from typing import Any
+
 from utils import files as file_ops
 from utils.file_descriptions import (
     APPEND_FILE_DESCRIPTION,
@@ -41,7 +44,7 @@ from utils.file_descriptions import (
     ZIP_PATHS_DESCRIPTION,
 )
 
-_TOOL_SPECS = [
+_TOOL_SPECS: tuple[tuple[str, str], ...] = (
     (
         "get_current_directory",
         GET_CURRENT_DIRECTORY_DESCRIPTION,
@@ -79,15 +82,30 @@ _TOOL_SPECS = [
     ("diff_files", DIFF_FILES_DESCRIPTION),
     ("zip_paths", ZIP_PATHS_DESCRIPTION),
     ("unzip_file", UNZIP_FILE_DESCRIPTION),
-]
+)
+
+_SPEC_MAP = dict(_TOOL_SPECS)
+_OPS = vars(file_ops)
+_NAMESPACE = globals()
+
+
+def __getattr__(name: str) -> Any:
+    """Wrap a file operation as a tool on first access.
+
+    The wrapped tool is published into the module namespace, so later lookups
+    resolve as plain attributes and never re-enter this hook.
+    """
+    description = _SPEC_MAP.get(name)
+    if description is None:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    from langchain_core.tools import tool
 
-for _name, _description in _TOOL_SPECS:
-    globals()[_name] = tool(description=_description, parse_docstring=False)(
-        getattr(file_ops, _name)
-    )
+    wrapped = tool(description=description, parse_docstring=False)(_OPS[name])
+    _NAMESPACE[name] = wrapped
+    return wrapped
 
 
 __all__ = [
     "FILE_USAGE_INSTRUCTIONS",
-    *[name for name, _ in _TOOL_SPECS],
+    *_SPEC_MAP,
 ]
@@ -1,13 +1,13 @@
 """LangChain tool bindings for planning operations.
 
 All concrete planning logic lives in `utils/plans.py`. This module exposes
-those functions as `@tool` instances with detailed descriptions.
+those functions as `@tool` instances with detailed descriptions. Module-level
+tools are wrapped lazily on first attribute access, and langchain is only
+imported once a tool is actually built.
 """
 
 from typing import Any
 
-from langchain_core.tools import tool
-
 from utils import plans as plan_ops
 from utils.plan_descriptions import (
     CREATE_PLAN_DESCRIPTION,
@@ -16,26 +16,44 @@ from utils.plan_descriptions import (
     REFLECT_ON_PLAN_DESCRIPTION,
     SET_SUBGOALS_DESCRIPTION,
     TRACK_PROGRESS_DESCRIPTION,
+    UPDATE_PLAN_BATCH_DESCRIPTION,
     UPDATE_PLAN_DESCRIPTION,
 )
 
-_TOOL_SPECS = [
+_TOOL_SPECS: tuple[tuple[str, str], ...] = (
     ("create_plan", CREATE_PLAN_DESCRIPTION),
     ("update_plan", UPDATE_PLAN_DESCRIPTION),
+    ("update_plan_batch", UPDATE_PLAN_BATCH_DESCRIPTION),
     ("decompose_task", DECOMPOSE_TASK_DESCRIPTION),
     ("set_subgoals", SET_SUBGOALS_DESCRIPTION),
     ("track_progress", TRACK_PROGRESS_DESCRIPTION),
     ("reflect_on_plan", REFLECT_ON_PLAN_DESCRIPTION),
-]
+)
 
-for _name, _description in _TOOL_SPECS:
-    globals()[_name] = tool(description=_description, parse_docstring=False)(
-        getattr(plan_ops, _name)
-    )
+_SPEC_MAP = dict(_TOOL_SPECS)
+_OPS = vars(plan_ops)
+_NAMESPACE = globals()
+
+
+def __getattr__(name: str) -> Any:
+    """Wrap a planning operation as a tool on first access.
+
+    The wrapped tool is published into the module namespace, so later lookups
+    resolve as plain attributes and never re-enter this hook.
+    """
+    description = _SPEC_MAP.get(name)
+    if description is None:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    from langchain_core.tools import tool
+
+    wrapped = tool(description=description, parse_docstring=False)(_OPS[name])
+    _NAMESPACE[name] = wrapped
+    return wrapped
 
 
 def make_scoped_plan_tools(plan_file: str) -> list[Any]:
     """Build plan tools bound to one concrete plan file."""
+    from langchain_core.tools import tool
 
     @tool("create_plan", description=CREATE_PLAN_DESCRIPTION, parse_docstring=False)
     def _create_plan(
@@ -63,6 +81,14 @@ def make_scoped_plan_tools(plan_file: str) -> list[Any]:
             plan_file=plan_file,
         )
 
+    @tool(
+        "update_plan_batch",
+        description=UPDATE_PLAN_BATCH_DESCRIPTION,
+        parse_docstring=False,
+    )
+    def _update_plan_batch(updates: list[dict[str, Any]]) -> str:
+        return plan_ops.update_plan_batch(updates=updates, plan_file=plan_file)
+
     @tool(
         "decompose_task",
         description=DECOMPOSE_TASK_DESCRIPTION,
@@ -122,6 +148,7 @@ def make_scoped_plan_tools(plan_file: str) -> list[Any]:
     return [
         _create_plan,
         _update_plan,
+        _update_plan_batch,
         _decompose_task,
         _set_subgoals,
         _track_progress,
@@ -132,5 +159,5 @@ def make_scoped_plan_tools(plan_file: str) -> list[Any]:
 __all__ = [
     "PLAN_USAGE_INSTRUCTIONS",
     "make_scoped_plan_tools",
-    *[name for name, _ in _TOOL_SPECS],
+    *_SPEC_MAP,
 ]
@@ -1,9 +1,7 @@
-"""Todo-style plan inspection tools built on markdown-backed plan state."""
+"""Todo-style plan inspection tools built on persisted plan state."""
 
 from __future__ import annotations
 
-import json
-from pathlib import Path
 from typing import Any
 
 from langchain_core.tools import tool
@@ -11,36 +9,16 @@ from langchain_core.tools import tool
 from utils import plans as plan_ops
 
 
-def _load_plan_state(plan_file: str) -> dict[str, Any] | None:
-    """Load embedded JSON state from a plan markdown file."""
-    path = Path(plan_file)
-    if not path.exists() or not path.is_file():
-        return None
-    try:
-        content = path.read_text(encoding="utf-8")
-    except OSError:
-        return None
-
-    match = plan_ops.STATE_PATTERN.search(content)
-    if match is None:
-        return None
-    try:
-        payload = json.loads(match.group(1))
-    except json.JSONDecodeError:
-        return None
-    return payload if isinstance(payload, dict) else None
-
-
 @tool(parse_docstring=False)
 def get_plan_overview(plan_file: str = plan_ops.DEFAULT_PLAN_FILE) -> dict[str, Any]:
-    """Return high-level metadata for the current plan file.
+    """Return high-level metadata for the current plan.
 
     Args:
-        plan_file: Markdown plan file path.
+        plan_file: Plan file path.
     """
-    state = _load_plan_state(plan_file)
+    state, error = plan_ops.load_plan_state(plan_file)
     if state is None:
-        return {"error": f"Unable to load plan state from '{plan_file}'"}
+        return {"error": error}
     return {
         "task": state.get("task", ""),
         "status": state.get("status", ""),
@@ -56,11 +34,11 @@ def get_open_steps(plan_file: str = plan_ops.DEFAULT_PLAN_FILE) -> list[dict[str
     """List all steps that are not completed.
 
     Args:
-        plan_file: Markdown plan file path.
+        plan_file: Plan file path.
     """
-    state = _load_plan_state(plan_file)
+    state, error = plan_ops.load_plan_state(plan_file)
     if state is None:
-        return [{"error": f"Unable to load plan state from '{plan_file}'"}]
+        return [{"error": error}]
 
     steps = state.get("steps", [])
     open_steps = [
@@ -86,7 +64,7 @@ def mark_step_completed(
     Args:
         step_number: 1-based step index.
         note: Optional progress note.
-        plan_file: Markdown plan file path.
+        plan_file: Plan file path.
     """
     return plan_ops.update_plan(
         step_number=step_number,
@@ -107,7 +85,7 @@ def mark_step_blocked(
     Args:
         step_number: 1-based step index.
         note: Required reason for the blocked state.
-        plan_file: Markdown plan file path.
+        plan_file: Plan file path.
     """
     return plan_ops.update_plan(
         step_number=step_number,
@@ -118,15 +96,15 @@ def mark_step_blocked(
 
 
 def make_scoped_todo_tools(plan_file: str) -> list[Any]:
-    """Build todo tools bound to one concrete plan file."""
+    """Build todo tools bound to one concrete plan."""
 
     @tool("get_plan_overview", parse_docstring=False)
     def _get_plan_overview() -> dict[str, Any]:
-        """Return high-level metadata for the current plan file."""
+        """Return high-level metadata for the current plan."""
 
-        state = _load_plan_state(plan_file)
+        state, error = plan_ops.load_plan_state(plan_file)
         if state is None:
-            return {"error": f"Unable to load plan state from '{plan_file}'"}
+            return {"error": error}
         return {
             "task": state.get("task", ""),
             "status": state.get("status", ""),
@@ -140,9 +118,9 @@ def make_scoped_todo_tools(plan_file: str) -> list[Any]:
     def _get_open_steps() -> list[dict[str, Any]]:
         """List all steps that are not completed."""
 
-        state = _load_plan_state(plan_file)
+        state, error = plan_ops.load_plan_state(plan_file)
         if state is None:
-            return [{"error": f"Unable to load plan state from '{plan_file}'"}]
+            return [{"error": error}]
 
         steps = state.get("steps", [])
         return [
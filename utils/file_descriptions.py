@@ -211,12 +211,13 @@ Parameters:
 - pattern (required)
 - root (optional, default='.')
 
-Matches both filename and workspace-relative path representations."""
+Matches both filename and workspace-relative path representations.
+Skips .git, node_modules, and __pycache__ directories."""
 
 SEARCH_IN_FILES_DESCRIPTION = """Search text across files under a root directory.
 
 Parameters:
-- query (required)
+- query (required; a string, or a list of strings to match any of)
 - root (optional, default='.')
 - case_sensitive (optional)
 - max_results (optional)
@@ -1,40 +1,144 @@
 """Comprehensive filesystem tools for project automation."""
 
+import codecs
 import difflib
+import errno
 import fnmatch
 import hashlib
+import mmap
 import os
+import re
 import shutil
-from collections.abc import Iterator
+import stat
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Optional
-from zipfile import ZIP_DEFLATED, ZipFile
+from typing import Any, Optional, TypeVar
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile, ZipInfo
 
 
 WORKSPACE_ROOT = Path(__file__).resolve().parents[1]
-IGNORE_DIRS = {".git", "node_modules", "__pycache__"}
+IGNORE_DIRS = frozenset({".git", "node_modules", "__pycache__"})
 MAX_FILE_SIZE = 100_000  # 100 KB
 DEFAULT_MAX_SEARCH_RESULTS = 200
+HASH_CACHE_SIZE = 2048
+HASH_CACHE_RACY_NS = 2_000_000_000  # 2 s
+BINARY_SNIFF_BYTES = 512
+READ_CHUNK_SIZE = 1 << 20  # 1 MiB
+MMAP_SEARCH_THRESHOLD = 16 * 1024  # 16 KB
+# Below this, warm-cache scans finish faster serially than on the pool.
+PARALLEL_SCAN_MIN_FILES = 256
+SEARCH_BATCH_FILES = 256
+TEXT_EXTENSIONS = frozenset(
+    {
+        ".css",
+        ".html",
+        ".js",
+        ".json",
+        ".md",
+        ".py",
+        ".rst",
+        ".toml",
+        ".ts",
+        ".txt",
+        ".yaml",
+        ".yml",
+    }
+)
+BINARY_EXTENSIONS = frozenset(
+    {
+        ".gif",
+        ".gz",
+        ".ico",
+        ".jpeg",
+        ".jpg",
+        ".pdf",
+        ".png",
+        ".pyc",
+        ".so",
+        ".whl",
+        ".zip",
+    }
+)
+INCOMPRESSIBLE_EXTENSIONS = frozenset(
+    {
+        ".7z",
+        ".bz2",
+        ".gif",
+        ".gz",
+        ".jpeg",
+        ".jpg",
+        ".mp3",
+        ".mp4",
+        ".png",
+        ".webp",
+        ".whl",
+        ".xz",
+        ".zip",
+    }
+)
+SMALL_COPY_BYTES = 4096
+ZIP_COMPRESS_LEVEL = 1
+ZIP_PREFETCH_BATCH_BYTES = 16 << 20  # 16 MiB held in memory per batch
+ZIP_PREFETCH_MAX_BYTES = 1 << 20  # 1 MiB
+_COPY_RANGE_FALLBACK_ERRNOS = frozenset(
+    {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EPERM}
+)
+# Errors that Path.exists() reports as "missing" rather than raising.
+_MISSING_PATH_ERRNOS = frozenset(
+    {errno.ENOENT, errno.ENOTDIR, errno.EBADF, errno.ELOOP}
+)
+_TEXT_BOMS = (codecs.BOM_UTF8, codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)
+_HASH_CACHE: OrderedDict[tuple[str, str], tuple[tuple[int, ...], str]] = OrderedDict()
+_HASH_CACHE_LOCK = threading.Lock()
+_FILE_EXECUTOR: ThreadPoolExecutor | None = None
+_FILE_EXECUTOR_LOCK = threading.Lock()
+_S = TypeVar("_S")
+_T = TypeVar("_T")
 
 
 def _resolve_workspace_path(path_value: str) -> Path:
-    """Resolve a path and block traversal outside workspace root."""
+    """Resolve a path and block traversal outside workspace root.
+
+    Resolution runs on every call: symlinks can be swapped underneath the
+    workspace by shell commands or the user, so results are never cached.
+    """
     raw_path = Path(path_value).expanduser()
     resolved = (
         raw_path.resolve()
         if raw_path.is_absolute()
         else (WORKSPACE_ROOT / raw_path).resolve()
     )
-    try:
-        resolved.relative_to(WORKSPACE_ROOT)
-    except ValueError as err:
+    root_text = os.fspath(WORKSPACE_ROOT)
+    resolved_text = os.fspath(resolved)
+    if resolved_text != root_text and not resolved_text.startswith(
+        os.path.join(root_text, "")
+    ):
         raise ValueError(
             f"Path '{path_value}' is outside workspace root '{WORKSPACE_ROOT.as_posix()}'"
-        ) from err
+        )
     return resolved
 
 
+def _forget_file_hashes(path: Path) -> None:
+    """Drop cached digests for a path and anything beneath it."""
+    path_text = path.as_posix()
+    prefix = f"{path_text.rstrip('/')}/"
+    with _HASH_CACHE_LOCK:
+        stale = [
+            key
+            for key in _HASH_CACHE
+            if key[0] == path_text or key[0].startswith(prefix)
+        ]
+        for key in stale:
+            del _HASH_CACHE[key]
+
+
 def _to_workspace_relative(path: Path) -> str:
     """Format a path relative to workspace root for stable output."""
     return path.relative_to(WORKSPACE_ROOT).as_posix()
@@ -44,35 +148,260 @@ def _iter_files(
     root: Path,
     *,
     include_hidden: bool = False,
-    ignore_dirs: Optional[set[str]] = None,
-) -> Iterator[Path]:
-    """Iterate files under root while applying directory and hidden filters."""
-    ignored = ignore_dirs or set()
-    for current_root, dirs, files in os.walk(root):
-        dirs[:] = [
-            entry
-            for entry in dirs
-            if entry not in ignored and (include_hidden or not entry.startswith("."))
-        ]
-        for file_name in files:
-            if not include_hidden and file_name.startswith("."):
-                continue
-            yield Path(current_root) / file_name
-
+    ignore_dirs: Optional[frozenset[str]] = None,
+) -> Iterator[os.DirEntry[str]]:
+    """Yield scandir file entries under root, skipping ignored and linked dirs."""
+    ignored = ignore_dirs or frozenset()
+    skip_hidden = not include_hidden
+    pending: list[str] = [os.fspath(root)]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as scanner:
+                entries = list(scanner)
+        except OSError:
+            continue
 
-def _is_probably_binary(file_path: Path) -> bool:
-    """Detect binary files using a null-byte check on an initial chunk."""
+        subdirs: list[str] = []
+        for entry in entries:
+            name = entry.name
+            if skip_hidden and name[0] == ".":
+                continue
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if not is_dir:
+                yield entry
+            elif name not in ignored and not entry.is_symlink():
+                subdirs.append(entry.path)
+        pending.extend(reversed(subdirs))
+
+
+def _entry_relative_path(entry: os.DirEntry[str]) -> str:
+    """Format a scandir entry under the workspace root without building a Path."""
+    relative = entry.path.removeprefix(os.path.join(WORKSPACE_ROOT, ""))
+    return relative if os.sep == "/" else relative.replace(os.sep, "/")
+
+
+def _is_probably_binary(file_path: Path | str) -> bool:
+    """Detect binary files by extension, BOM, then a null-byte check."""
+    suffix = os.path.splitext(file_path)[1].lower()
+    if suffix in TEXT_EXTENSIONS:
+        return False
+    if suffix in BINARY_EXTENSIONS:
+        return True
+    try:
+        fd = os.open(file_path, os.O_RDONLY)
+    except OSError:
+        return True
     try:
-        with file_path.open("rb") as file:
-            chunk = file.read(1024)
+        chunk = os.read(fd, BINARY_SNIFF_BYTES)
     except OSError:
         return True
-    return b"\x00" in chunk
+    finally:
+        os.close(fd)
+    if chunk.startswith(_TEXT_BOMS):
+        return False
+    return chunk.find(b"\x00") != -1
+
+
+def _copy_file_data(src: Path, dst: Path) -> None:
+    """Copy file bytes, letting the kernel copy within one filesystem."""
+    if dst.exists() and os.path.samefile(src, dst):
+        raise shutil.SameFileError(f"{src} and {dst} are the same file")
+
+    src_stat = src.stat()
+    if src_stat.st_size < SMALL_COPY_BYTES:
+        dst.write_bytes(_read_file_bytes(src))
+        return
+    if (
+        not hasattr(os, "copy_file_range")
+        or src_stat.st_dev != dst.parent.stat().st_dev
+    ):
+        shutil.copyfile(src, dst)
+        return
+
+    with src.open("rb") as source, dst.open("wb") as target:
+        try:
+            while os.copy_file_range(
+                source.fileno(), target.fileno(), src_stat.st_size
+            ):
+                pass
+        except OSError as err:
+            if err.errno not in _COPY_RANGE_FALLBACK_ERRNOS:
+                raise
+            source.seek(0)
+            target.seek(0)
+            target.truncate()
+            shutil.copyfileobj(source, target)
+
+
+def _zip_compress_type(file_path: Path) -> int:
+    """Store already-compressed formats and deflate everything else."""
+    if file_path.suffix.lower() in INCOMPRESSIBLE_EXTENSIONS:
+        return ZIP_STORED
+    return ZIP_DEFLATED
+
+
+def _load_zip_member(file_path: Path) -> tuple[ZipInfo, bytes | None]:
+    """Build a member header and prefetch small file contents for zipping."""
+    info = ZipInfo.from_file(file_path, arcname=_to_workspace_relative(file_path))
+    info.compress_type = _zip_compress_type(file_path)
+    if info.file_size > ZIP_PREFETCH_MAX_BYTES:
+        return info, None
+    return info, _read_file_bytes(file_path)
+
+
+def _zip_prefetch_batches(members: list[tuple[Path, int]]) -> Iterator[list[Path]]:
+    """Group zip members so each batch prefetches at most the byte budget.
+
+    Files too large to prefetch are streamed later and do not count.
+    """
+    batch: list[Path] = []
+    batch_bytes = 0
+    for member, size in members:
+        prefetched = size if size <= ZIP_PREFETCH_MAX_BYTES else 0
+        if batch and batch_bytes + prefetched > ZIP_PREFETCH_BATCH_BYTES:
+            yield batch
+            batch = []
+            batch_bytes = 0
+        batch.append(member)
+        batch_bytes += prefetched
+    if batch:
+        yield batch
+
+
+def _read_text_lines(file_path: Path) -> list[str]:
+    """Read UTF-8 text straight into lines, keeping line endings."""
+    with file_path.open(encoding="utf-8") as file:
+        return file.readlines()
+
+
+def _mapped_contains(file_path: Path, needle: bytes) -> bool:
+    """Check for raw bytes in a file through a read-only memory map."""
+    with (
+        file_path.open("rb") as file,
+        mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+    ):
+        return mapped.find(needle) != -1
+
+
+def _read_file_bytes(file_path: Path) -> bytes:
+    """Read a whole file through a raw descriptor."""
+    fd = os.open(file_path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        chunks = [os.read(fd, max(os.fstat(fd).st_size, 1))]
+        while chunks[-1]:
+            chunks.append(os.read(fd, READ_CHUNK_SIZE))
+    finally:
+        os.close(fd)
+    return b"".join(chunks)
 
 
 def _read_text_file(file_path: Path) -> str:
-    """Read a text file with UTF-8 encoding."""
-    return file_path.read_text(encoding="utf-8")
+    """Read a text file with UTF-8 encoding and universal newlines."""
+    text = _read_file_bytes(file_path).decode("utf-8")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def _file_worker_count() -> int:
+    """Return the thread count used for per-file scans."""
+    return min(32, (os.cpu_count() or 1) * 4)
+
+
+def _file_executor() -> ThreadPoolExecutor:
+    """Return the shared per-file scan pool, starting it on first use."""
+    global _FILE_EXECUTOR
+    with _FILE_EXECUTOR_LOCK:
+        if _FILE_EXECUTOR is None:
+            _FILE_EXECUTOR = ThreadPoolExecutor(
+                max_workers=_file_worker_count(), thread_name_prefix="file-scan"
+            )
+        return _FILE_EXECUTOR
+
+
+def _map_files(func: Callable[[_S], _T], items: list[_S]) -> list[_T]:
+    """Apply func to each item, in order, on the shared pool for large batches.
+
+    Small batches run inline: the pool only pays off when enough slow reads
+    can overlap. Callers must not nest `_map_files` inside a mapped function.
+    """
+    if len(items) < PARALLEL_SCAN_MIN_FILES:
+        return [func(item) for item in items]
+    return list(_file_executor().map(func, items, chunksize=64))
+
+
+def _is_listable_text_file(entry: os.DirEntry[str], max_file_size: int) -> bool:
+    """Return True for readable non-binary files within the size limit."""
+    try:
+        file_size = entry.stat().st_size
+    except OSError:
+        return False
+    if file_size > max_file_size:
+        return False
+    return file_size == 0 or not _is_probably_binary(entry.path)
+
+
+def _search_file(
+    entry: os.DirEntry[str],
+    matches: Callable[[str], bool],
+    raw_needle: bytes | None,
+    max_results: int,
+) -> list[dict[str, Any]]:
+    """Return up to max_results matching lines from one text file."""
+    try:
+        file_size = entry.stat().st_size
+    except OSError:
+        return []
+    if file_size == 0 or file_size > MAX_FILE_SIZE:
+        return []
+    if _is_probably_binary(entry.path):
+        return []
+    file_path = Path(entry.path)
+    if raw_needle is not None and file_size > MMAP_SEARCH_THRESHOLD:
+        try:
+            if not _mapped_contains(file_path, raw_needle):
+                return []
+        except (OSError, ValueError):
+            return []
+
+    try:
+        text = _read_text_file(file_path)
+    except (UnicodeDecodeError, OSError):
+        return []
+    if not matches(text):
+        return []
+
+    found: list[dict[str, Any]] = []
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        if matches(line):
+            found.append(
+                {
+                    "path": _entry_relative_path(entry),
+                    "line_number": line_number,
+                    "line": line[:1000],
+                }
+            )
+            if len(found) >= max_results:
+                break
+    return found
+
+
+def _query_matcher(
+    query: str | list[str], case_sensitive: bool
+) -> Callable[[str], bool]:
+    """Build a substring test for one query or a single regex for several."""
+    if isinstance(query, str):
+        if case_sensitive:
+            return lambda text: query in text
+        needle = query.lower()
+        return lambda text: needle in text.lower()
+
+    flags = 0 if case_sensitive else re.IGNORECASE
+    pattern = re.compile("|".join(map(re.escape, query)), flags)
+    return lambda text: pattern.search(text) is not None
 
 
 def _safe_list_files_impl(
@@ -94,32 +423,50 @@ def _safe_list_files_impl(
     if not target_dir.is_dir():
         return [f"Error: '{directory}' is not a directory"]
 
-    collected: list[str] = []
-    for file_path in _iter_files(
-        target_dir,
-        include_hidden=include_hidden,
-        ignore_dirs=IGNORE_DIRS,
-    ):
-        try:
-            if file_path.stat().st_size > max_file_size:
-                continue
-        except OSError:
-            continue
-        if _is_probably_binary(file_path):
-            continue
-        collected.append(_to_workspace_relative(file_path))
-
+    candidates = list(
+        _iter_files(
+            target_dir,
+            include_hidden=include_hidden,
+            ignore_dirs=IGNORE_DIRS,
+        )
+    )
+    keep = _map_files(
+        lambda entry: _is_listable_text_file(entry, max_file_size),
+        candidates,
+    )
+    collected = [
+        _entry_relative_path(entry)
+        for entry, listed in zip(candidates, keep, strict=True)
+        if listed
+    ]
     collected.sort()
     return collected
 
 
+def _tree_children(directory: Path | str) -> list[tuple[str, str, bool]]:
+    """Return (name, path, is_dir) children, directories first, by lowercase name."""
+    dirs: list[tuple[str, str, str]] = []
+    files: list[tuple[str, str, str]] = []
+    with os.scandir(directory) as scanner:
+        for entry in scanner:
+            bucket = dirs if entry.is_dir() else files
+            bucket.append((entry.name.lower(), entry.name, entry.path))
+    dirs.sort(key=itemgetter(0))
+    files.sort(key=itemgetter(0))
+    return [(name, path, True) for _, name, path in dirs] + [
+        (name, path, False) for _, name, path in files
+    ]
+
+
 def _format_numbered_lines(lines: list[str], start: int, end: Optional[int]) -> str:
     """Render a line slice with 1-based line numbers."""
     stop = len(lines) if end is None else min(end, len(lines))
-    result = []
-    for idx in range(start - 1, stop):
-        result.append(f"{idx + 1:6d}\t{lines[idx]}")
-    return "\n".join(result)
+    return "\n".join(
+        [
+            f"{number:6d}\t{line}"
+            for number, line in enumerate(lines[start - 1 : stop], start)
+        ]
+    )
 
 
 def _read_file_lines_impl(file_path: str, start: int, end: Optional[int]) -> str:
@@ -204,7 +551,9 @@ def list_all_files(directory: str = ".") -> list[str]:
         return [f"Error: '{directory}' is not a directory"]
 
     files = [
-        _to_workspace_relative(path) for path in target_dir.rglob("*") if path.is_file()
+        _entry_relative_path(entry)
+        for entry in _iter_files(target_dir, include_hidden=True)
+        if entry.is_file()
     ]
     files.sort()
     return files
@@ -299,18 +648,17 @@ def get_file_tree(directory: str = ".", indent_unit: str = "    ") -> str:
         return f"Error: '{directory}' is not a directory"
 
     lines: list[str] = []
-
-    def walk(current: Path, level: int) -> None:
-        for item in sorted(
-            current.iterdir(),
-            key=lambda p: (not p.is_dir(), p.name.lower()),
-        ):
-            marker = "/" if item.is_dir() else ""
-            lines.append(f"{indent_unit * level}{item.name}{marker}")
-            if item.is_dir():
-                walk(item, level + 1)
-
-    walk(target_dir, 0)
+    indents: list[str] = []
+    stack = [(0, child) for child in reversed(_tree_children(target_dir))]
+    while stack:
+        level, (name, path, is_directory) = stack.pop()
+        if level == len(indents):
+            indents.append(indent_unit * level)
+        if is_directory:
+            lines.append(f"{indents[level]}{name}/")
+            stack.extend((level + 1, child) for child in reversed(_tree_children(path)))
+        else:
+            lines.append(indents[level] + name)
     return "\n".join(lines)
 
 
@@ -351,6 +699,7 @@ def write_file(
         if create_dirs:
             resolved.parent.mkdir(parents=True, exist_ok=True)
         resolved.write_text(content, encoding="utf-8")
+        _forget_file_hashes(resolved)
         return f"Updated file {_to_workspace_relative(resolved)}"
     except OSError as err:
         return f"Error: Unable to write '{file_path}': {err}"
@@ -371,6 +720,7 @@ def append_file(file_path: str, content: str, create_dirs: bool = True) -> str:
             resolved.parent.mkdir(parents=True, exist_ok=True)
         with resolved.open("a", encoding="utf-8") as file:
             file.write(content)
+        _forget_file_hashes(resolved)
         return f"Appended content to {_to_workspace_relative(resolved)}"
     except OSError as err:
         return f"Error: Unable to append '{file_path}': {err}"
@@ -420,6 +770,7 @@ def delete_file(file_path: str, missing_ok: bool = False) -> str:
 
     try:
         resolved.unlink()
+        _forget_file_hashes(resolved)
         return f"Deleted file {_to_workspace_relative(resolved)}"
     except OSError as err:
         return f"Error: Unable to delete '{file_path}': {err}"
@@ -462,6 +813,7 @@ def delete_directory(
             shutil.rmtree(resolved)
         else:
             resolved.rmdir()
+        _forget_file_hashes(resolved)
         return f"Deleted directory {_to_workspace_relative(resolved)}/"
     except OSError as err:
         return f"Error: Unable to delete directory '{path}': {err}"
@@ -493,7 +845,8 @@ def copy_file(
     try:
         if create_dirs:
             dst.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(src, dst)
+        _copy_file_data(src, dst)
+        shutil.copystat(src, dst)
         return f"Copied {_to_workspace_relative(src)} -> {_to_workspace_relative(dst)}"
     except OSError as err:
         return f"Error: Unable to copy file: {err}"
@@ -538,6 +891,8 @@ def move_path(
         if create_dirs:
             dst.parent.mkdir(parents=True, exist_ok=True)
         shutil.move(str(src), str(dst))
+        _forget_file_hashes(src)
+        _forget_file_hashes(dst)
         return f"Moved {_to_workspace_relative(src)} -> {_to_workspace_relative(dst)}"
     except OSError as err:
         return f"Error: Unable to move path: {err}"
@@ -576,6 +931,8 @@ def rename_path(source: str, new_name: str, overwrite: bool = False) -> str:
 
     try:
         src.rename(dst)
+        _forget_file_hashes(src)
+        _forget_file_hashes(dst)
         return f"Renamed {_to_workspace_relative(src)} -> {_to_workspace_relative(dst)}"
     except OSError as err:
         return f"Error: Unable to rename path: {err}"
@@ -612,20 +969,19 @@ def get_file_info(path: str) -> dict[str, Any]:
     except ValueError as err:
         return {"error": str(err)}
 
-    if not resolved.exists():
-        return {"path": path, "exists": False}
-
     try:
         stats = resolved.stat()
     except OSError as err:
+        if err.errno in _MISSING_PATH_ERRNOS:
+            return {"path": path, "exists": False}
         return {"error": f"Unable to stat '{path}': {err}"}
 
     return {
         "path": _to_workspace_relative(resolved),
         "absolute_path": resolved.as_posix(),
         "exists": True,
-        "is_file": resolved.is_file(),
-        "is_dir": resolved.is_dir(),
+        "is_file": stat.S_ISREG(stats.st_mode),
+        "is_dir": stat.S_ISDIR(stats.st_mode),
         "size_bytes": stats.st_size,
         "modified_utc": datetime.fromtimestamp(
             stats.st_mtime, tz=timezone.utc
@@ -653,25 +1009,33 @@ def find_files(pattern: str, root: str = ".") -> list[str]:
     if not root_dir.exists() or not root_dir.is_dir():
         return [f"Error: Root directory '{root}' not found"]
 
+    normcase = os.path.normcase
+    matches_pattern = re.compile(fnmatch.translate(normcase(pattern))).match
+    # A pattern with no separator or wildcard can only match a bare file name.
+    check_relative = any(char in pattern for char in "/*?[")
+
     matches: list[str] = []
-    for path in root_dir.rglob("*"):
-        if not path.is_file():
+    for entry in _iter_files(root_dir, include_hidden=True, ignore_dirs=IGNORE_DIRS):
+        if not entry.is_file():
             continue
-        rel = _to_workspace_relative(path)
-        if fnmatch.fnmatch(path.name, pattern) or fnmatch.fnmatch(rel, pattern):
+        rel = _entry_relative_path(entry)
+        if matches_pattern(normcase(entry.name)) or (
+            check_relative and matches_pattern(normcase(rel))
+        ):
             matches.append(rel)
     matches.sort()
     return matches
 
 
 def search_in_files(
-    query: str,
+    query: str | list[str],
     root: str = ".",
     case_sensitive: bool = False,
     max_results: int = DEFAULT_MAX_SEARCH_RESULTS,
 ) -> list[dict[str, Any]]:
-    """Search for a string in text files."""
-    if not query:
+    """Search for a string, or any of several strings, in text files."""
+    queries = [query] if isinstance(query, str) else query
+    if not queries or not all(queries):
         return [{"error": "query must not be empty"}]
     if max_results <= 0:
         return [{"error": "max_results must be > 0"}]
@@ -684,39 +1048,28 @@ def search_in_files(
     if not root_dir.exists() or not root_dir.is_dir():
         return [{"error": f"Root directory '{root}' not found"}]
 
-    results: list[dict[str, Any]] = []
-    needle = query if case_sensitive else query.lower()
-
-    for file_path in _iter_files(
-        root_dir,
-        include_hidden=False,
-        ignore_dirs=IGNORE_DIRS,
-    ):
-        try:
-            if file_path.stat().st_size > MAX_FILE_SIZE:
-                continue
-        except OSError:
-            continue
-        if _is_probably_binary(file_path):
-            continue
+    matches = _query_matcher(query, case_sensitive)
+    raw_needle = (
+        query.encode("utf-8") if isinstance(query, str) and case_sensitive else None
+    )
+    candidates = list(
+        _iter_files(
+            root_dir,
+            include_hidden=False,
+            ignore_dirs=IGNORE_DIRS,
+        )
+    )
 
-        try:
-            lines = _read_text_file(file_path).splitlines()
-        except (UnicodeDecodeError, OSError):
-            continue
+    def search_one(entry: os.DirEntry[str]) -> list[dict[str, Any]]:
+        return _search_file(entry, matches, raw_needle, max_results)
 
-        for line_number, line in enumerate(lines, start=1):
-            haystack = line if case_sensitive else line.lower()
-            if needle in haystack:
-                results.append(
-                    {
-                        "path": _to_workspace_relative(file_path),
-                        "line_number": line_number,
-                        "line": line[:1000],
-                    }
-                )
-                if len(results) >= max_results:
-                    return results
+    results: list[dict[str, Any]] = []
+    for offset in range(0, len(candidates), SEARCH_BATCH_FILES):
+        batch = candidates[offset : offset + SEARCH_BATCH_FILES]
+        for found in _map_files(search_one, batch):
+            results.extend(found)
+            if len(results) >= max_results:
+                return results[:max_results]
 
     return results
 
@@ -743,18 +1096,21 @@ def replace_in_file(file_path: str, old: str, new: str, count: int = -1) -> str:
     except OSError as err:
         return f"Error: Unable to read '{file_path}': {err}"
 
-    if count < 0:
-        replacements = content.count(old)
-        updated = content.replace(old, new)
+    updated = content.replace(old, new, count)
+    delta = len(new) - len(old)
+    if delta:
+        # Each replacement shifts the length by the same amount.
+        replacements = (len(updated) - len(content)) // delta
     else:
-        replacements = min(content.count(old), count)
-        updated = content.replace(old, new, count)
+        found = content.count(old)
+        replacements = found if count < 0 else min(found, count)
 
     if replacements == 0:
         return f"No matches found in {_to_workspace_relative(resolved)}"
 
     try:
         resolved.write_text(updated, encoding="utf-8")
+        _forget_file_hashes(resolved)
     except OSError as err:
         return f"Error: Unable to write '{file_path}': {err}"
 
@@ -779,13 +1135,35 @@ def compute_file_hash(file_path: str, algorithm: str = "sha256") -> str:
         return f"Error: Unsupported hash algorithm '{algorithm}'"
 
     try:
-        with resolved.open("rb") as file:
-            for chunk in iter(lambda: file.read(8192), b""):
-                hasher.update(chunk)
+        stats = resolved.stat()
     except OSError as err:
         return f"Error: Unable to hash '{file_path}': {err}"
+    cache_key = (resolved.as_posix(), algorithm)
+    stamp = (stats.st_mtime_ns, stats.st_ctime_ns, stats.st_size, stats.st_ino)
+    with _HASH_CACHE_LOCK:
+        cached = _HASH_CACHE.get(cache_key)
+        if cached is not None and cached[0] == stamp:
+            _HASH_CACHE.move_to_end(cache_key)
+            return f"{algorithm}:{cached[1]}"
 
-    return f"{algorithm}:{hasher.hexdigest()}"
+    try:
+        with open(resolved, "rb", buffering=0) as file:
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            hashlib.file_digest(file, lambda: hasher)
+    except OSError as err:
+        return f"Error: Unable to hash '{file_path}': {err}"
+
+    digest = hasher.hexdigest()
+    # A file modified within the timestamp granularity window could change again
+    # without moving its mtime, so only settled files are remembered.
+    if time.time_ns() - stats.st_mtime_ns > HASH_CACHE_RACY_NS:
+        with _HASH_CACHE_LOCK:
+            _HASH_CACHE[cache_key] = (stamp, digest)
+            _HASH_CACHE.move_to_end(cache_key)
+            while len(_HASH_CACHE) > HASH_CACHE_SIZE:
+                _HASH_CACHE.popitem(last=False)
+    return f"{algorithm}:{digest}"
 
 
 def diff_files(file_a: str, file_b: str, context_lines: int = 3) -> str:
@@ -805,8 +1183,8 @@ def diff_files(file_a: str, file_b: str, context_lines: int = 3) -> str:
         return f"Error: File '{file_b}' not found"
 
     try:
-        lines_a = _read_text_file(path_a).splitlines(keepends=True)
-        lines_b = _read_text_file(path_b).splitlines(keepends=True)
+        lines_a = _read_text_lines(path_a)
+        lines_b = _read_text_lines(path_b)
     except UnicodeDecodeError:
         return "Error: Both files must be UTF-8 text for diff"
     except OSError as err:
@@ -845,39 +1223,51 @@ def zip_paths(
     except OSError as err:
         return f"Error: Unable to prepare output path '{output_zip}': {err}"
 
-    added = 0
+    members: list[tuple[Path, int]] = []
     try:
-        with ZipFile(zip_path, mode="w", compression=ZIP_DEFLATED) as archive:
-            for raw_path in paths:
-                src = _resolve_workspace_path(raw_path)
-                if not src.exists():
-                    return f"Error: Input path '{raw_path}' not found"
+        for raw_path in paths:
+            src = _resolve_workspace_path(raw_path)
+            if not src.exists():
+                return f"Error: Input path '{raw_path}' not found"
+            if src.is_file():
+                members.append((src, src.stat().st_size))
+            else:
+                members.extend(
+                    (Path(entry.path), entry.stat().st_size)
+                    for entry in _iter_files(src, include_hidden=True)
+                    if entry.is_file()
+                )
+    except ValueError as err:
+        return f"Error: {err}"
+    except OSError as err:
+        return f"Error: Unable to read input paths: {err}"
+    members = [member for member in members if member[0] != zip_path]
 
-                if src.is_file():
-                    if src == zip_path:
-                        continue
-                    archive.write(
-                        src,
-                        arcname=_to_workspace_relative(src),
-                    )
-                    added += 1
-                else:
-                    for item in src.rglob("*"):
-                        if not item.is_file():
-                            continue
-                        if item == zip_path:
-                            continue
+    try:
+        with ZipFile(
+            zip_path,
+            mode="w",
+            compression=ZIP_DEFLATED,
+            compresslevel=ZIP_COMPRESS_LEVEL,
+        ) as archive:
+            for batch in _zip_prefetch_batches(members):
+                for member, (info, data) in zip(
+                    batch, _map_files(_load_zip_member, batch), strict=True
+                ):
+                    if data is None:
                         archive.write(
-                            item,
-                            arcname=_to_workspace_relative(item),
+                            member,
+                            arcname=info.filename,
+                            compress_type=info.compress_type,
                         )
-                        added += 1
+                    else:
+                        archive.writestr(info, data, compresslevel=ZIP_COMPRESS_LEVEL)
     except ValueError as err:
         return f"Error: {err}"
     except OSError as err:
         return f"Error: Unable to create zip '{output_zip}': {err}"
 
-    return f"Created zip {_to_workspace_relative(zip_path)} with {added} file(s)"
+    return f"Created zip {_to_workspace_relative(zip_path)} with {len(members)} file(s)"
 
 
 def unzip_file(
@@ -6,9 +6,13 @@ Recommended workflow:
 1. Break down the request with decompose_task().
 2. Create persistent plan state with create_plan().
 3. Refine target outcomes with set_subgoals().
-4. Keep step state current with update_plan().
+4. Keep step state current with update_plan(), or update_plan_batch() when
+   several steps change at once.
 5. Record execution progress with track_progress().
 6. Capture lessons and close the loop with reflect_on_plan().
+
+Read and change plan state only through these tools. plan_file names the plan;
+depending on the configured backend it may not exist as a file on disk.
 """
 
 CREATE_PLAN_DESCRIPTION = """Create a new markdown-backed execution plan.
@@ -19,7 +23,7 @@ Parameters:
 - plan_file (optional, default='agent_plan.md')
 - overwrite (optional, default=False)
 
-Creates plan state in a markdown file under the workspace."""
+Stores plan state under plan_file (a markdown file with the default backend)."""
 
 UPDATE_PLAN_DESCRIPTION = """Update status for one step in an existing plan.
 
@@ -31,6 +35,15 @@ Parameters:
 
 Updates step status and optionally appends a progress note."""
 
+UPDATE_PLAN_BATCH_DESCRIPTION = """Update status for several plan steps in one call.
+
+Parameters:
+- updates (required; list of {step_number, status, note?} objects)
+- plan_file (optional, default='agent_plan.md')
+
+Applies updates in order and saves the plan once. If any update is invalid,
+no changes are saved."""
+
 DECOMPOSE_TASK_DESCRIPTION = """Break a task string into actionable steps.
 
 Parameters:
@@ -76,6 +89,7 @@ __all__ = [
     "PLAN_USAGE_INSTRUCTIONS",
     "CREATE_PLAN_DESCRIPTION",
     "UPDATE_PLAN_DESCRIPTION",
+    "UPDATE_PLAN_BATCH_DESCRIPTION",
     "DECOMPOSE_TASK_DESCRIPTION",
     "SET_SUBGOALS_DESCRIPTION",
     "TRACK_PROGRESS_DESCRIPTION",
@@ -1,9 +1,22 @@
-"""Planning utilities with markdown-backed persistent state."""
+"""Planning utilities with markdown-backed persistent state.
+
+Plan state is read and written through `_BACKEND`, which defaults to the
+markdown file backend; `configure_backend()` switches it to SQLite. Tests
+may swap in `MemoryPlanBackend` to exercise plan logic without touching the
+filesystem.
+"""
 
 from __future__ import annotations
 
+import errno
 import json
+import os
 import re
+import sqlite3
+import stat
+import threading
+import time
+from copy import deepcopy
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
@@ -11,31 +24,38 @@ from typing import Any
 WORKSPACE_ROOT = Path(__file__).resolve().parents[1]
 DEFAULT_PLAN_FILE = "agent_plan.md"
 VALID_STATUSES = {"pending", "in_progress", "completed", "blocked"}
+PLAN_CACHE_RACY_NS = 2_000_000_000  # 2 s
 
 STATE_START = "<!-- PLAN_STATE_JSON_START -->"
 STATE_END = "<!-- PLAN_STATE_JSON_END -->"
-STATE_PATTERN = re.compile(
-    rf"{re.escape(STATE_START)}\s*```json\s*(\{{.*\}})\s*```"
-    rf"\s*{re.escape(STATE_END)}",
-    flags=re.DOTALL,
-)
+# When False, plan files hold only the fenced JSON state block.
+RENDER_MARKDOWN_VIEW = True
+# Splits on sentence punctuation and on step connectors in one scan.
+_STEP_SPLIT_RE = re.compile(r"[;\n.]+|\b(?:then|after that|next)\b", flags=re.I)
 
 
 def _resolve_workspace_path(path_value: str) -> Path:
-    """Resolve a path and reject traversal outside the workspace root."""
-    raw_path = Path(path_value).expanduser()
+    """Resolve a path and reject traversal outside the workspace root.
+
+    Never cached: other writers can swap directories for symlinks at any time.
+    """
+    raw_path = Path(path_value)
+    if path_value.startswith("~"):
+        raw_path = raw_path.expanduser()
     resolved = (
         raw_path.resolve()
         if raw_path.is_absolute()
         else (WORKSPACE_ROOT / raw_path).resolve()
     )
-    try:
-        resolved.relative_to(WORKSPACE_ROOT)
-    except ValueError as err:
+    root_text = os.fspath(WORKSPACE_ROOT)
+    resolved_text = os.fspath(resolved)
+    if resolved_text != root_text and not resolved_text.startswith(
+        os.path.join(root_text, "")
+    ):
         raise ValueError(
             f"Path '{path_value}' is outside workspace root "
             f"'{WORKSPACE_ROOT.as_posix()}'"
-        ) from err
+        )
     return resolved
 
 
@@ -94,12 +114,10 @@ def _coerce_item_list(raw_items: Any) -> list[dict[str, Any]]:
         if status not in VALID_STATUSES:
             status = "pending"
 
-        items.append({"description": description, "status": status})
-
-    return [
-        {"id": idx, "description": item["description"], "status": item["status"]}
-        for idx, item in enumerate(items, start=1)
-    ]
+        items.append(
+            {"id": len(items) + 1, "description": description, "status": status}
+        )
+    return items
 
 
 def _coerce_progress(raw_progress: Any) -> list[dict[str, Any]]:
@@ -116,7 +134,7 @@ def _coerce_progress(raw_progress: Any) -> list[dict[str, Any]]:
         percent = entry.get("percent_complete")
         if not message:
             continue
-        if not isinstance(percent, int):
+        if not isinstance(percent, int) or isinstance(percent, bool):
             percent = None
         progress.append(
             {
@@ -162,11 +180,14 @@ def _coerce_state(raw_state: dict[str, Any]) -> dict[str, Any]:
     if status not in {"active", "completed"}:
         status = "active"
 
-    percent_complete = raw_state.get("percent_complete")
-    if not isinstance(percent_complete, int):
-        percent_complete = None
-    elif percent_complete < 0 or percent_complete > 100:
-        percent_complete = None
+    percent = raw_state.get("percent_complete")
+    percent_complete = (
+        percent
+        if isinstance(percent, int)
+        and not isinstance(percent, bool)
+        and 0 <= percent <= 100
+        else None
+    )
 
     return {
         "task": str(raw_state.get("task", "")).strip(),
@@ -181,58 +202,90 @@ def _coerce_state(raw_state: dict[str, Any]) -> dict[str, Any]:
     }
 
 
-def _format_items(items: list[dict[str, Any]]) -> str:
-    """Render checklist items for markdown view."""
+def _copy_state(state: dict[str, Any]) -> dict[str, Any]:
+    """Copy already-coerced state without re-validating any field.
+
+    Rebuilds every mutable container so callers can edit the result freely.
+    """
+    return {
+        **state,
+        "steps": [{**item} for item in state["steps"]],
+        "subgoals": [{**item} for item in state["subgoals"]],
+        "progress_log": [{**entry} for entry in state["progress_log"]],
+        "reflections": [
+            {
+                **reflection,
+                "risks": [*reflection["risks"]],
+                "next_actions": [*reflection["next_actions"]],
+            }
+            for reflection in state["reflections"]
+        ],
+    }
+
+
+def _format_items(items: list[dict[str, Any]]) -> list[str]:
+    """Render checklist items as markdown lines.
+
+    Items come from `_coerce_item_list`, `_build_plan_items`, or
+    `set_subgoals`, which always set `id`, `description`, and `status`.
+    """
     if not items:
-        return "- (none)"
+        return ["- (none)"]
+
+    return [
+        f"{item['id']}. [{'x' if item['status'] == 'completed' else ' '}] "
+        f"({item['status']}) {item['description']}"
+        for item in items
+    ]
 
-    lines: list[str] = []
-    for item in items:
-        status = str(item.get("status", "pending"))
-        checked = "x" if status == "completed" else " "
-        lines.append(
-            f"{item.get('id', 0)}. [{checked}] ({status}) {item.get('description', '')}"
-        )
-    return "\n".join(lines)
 
+def _format_progress(entries: list[dict[str, Any]]) -> list[str]:
+    """Render progress timeline as markdown lines.
 
-def _format_progress(entries: list[dict[str, Any]]) -> str:
-    """Render progress timeline for markdown view."""
+    Every writer of progress entries sets `timestamp`, `message`, and
+    `percent_complete` (possibly None).
+    """
     if not entries:
-        return "- (none)"
+        return ["- (none)"]
 
-    lines: list[str] = []
+    lines = []
     for entry in entries:
-        percent = entry.get("percent_complete")
-        percent_label = f"{percent}%" if isinstance(percent, int) else "-"
-        lines.append(
-            f"- {entry.get('timestamp', '')} | {percent_label} | "
-            f"{entry.get('message', '')}"
-        )
-    return "\n".join(lines)
+        percent = entry["percent_complete"]
+        percent_text = f"{percent}%" if isinstance(percent, int) else "-"
+        lines.append(f"- {entry['timestamp']} | {percent_text} | {entry['message']}")
+    return lines
 
 
-def _format_reflections(reflections: list[dict[str, Any]]) -> str:
-    """Render reflection section for markdown view."""
+def _format_reflections(reflections: list[dict[str, Any]]) -> list[str]:
+    """Render reflection section as markdown lines."""
     if not reflections:
-        return "- (none)"
+        return ["- (none)"]
 
     lines: list[str] = []
     for idx, reflection in enumerate(reflections, start=1):
-        lines.append(f"### Reflection {idx} ({reflection.get('timestamp', '')})")
-        lines.append(reflection.get("summary", ""))
+        lines.append(f"### Reflection {idx} ({reflection['timestamp']})")
+        lines.append(reflection["summary"])
 
-        risks = reflection.get("risks", [])
+        risks = reflection["risks"]
         if risks:
             lines.append("Risks:")
             lines.extend(f"- {risk}" for risk in risks)
 
-        next_actions = reflection.get("next_actions", [])
+        next_actions = reflection["next_actions"]
         if next_actions:
             lines.append("Next Actions:")
             lines.extend(f"- {action}" for action in next_actions)
 
-    return "\n".join(lines)
+    return lines
+
+
+def _dump_state_json(state: dict[str, Any]) -> str:
+    """Encode plan state for the embedded block.
+
+    The block is indented because people read, edit, and diff the plan file;
+    keys stay sorted so saves remain deterministic.
+    """
+    return json.dumps(state, indent=2, sort_keys=True)
 
 
 def _serialize_markdown(state: dict[str, Any]) -> str:
@@ -251,21 +304,21 @@ def _serialize_markdown(state: dict[str, Any]) -> str:
         f"- Updated (UTC): {state.get('updated_at', '')}",
         "",
         "## Steps",
-        _format_items(state.get("steps", [])),
+        *_format_items(state.get("steps", [])),
         "",
         "## Subgoals",
-        _format_items(state.get("subgoals", [])),
+        *_format_items(state.get("subgoals", [])),
         "",
         "## Progress Log",
-        _format_progress(state.get("progress_log", [])),
+        *_format_progress(state.get("progress_log", [])),
         "",
         "## Reflections",
-        _format_reflections(state.get("reflections", [])),
+        *_format_reflections(state.get("reflections", [])),
         "",
         "---",
         STATE_START,
         "```json",
-        json.dumps(state, indent=2, sort_keys=True),
+        _dump_state_json(state),
         "```",
         STATE_END,
         "",
@@ -273,14 +326,53 @@ def _serialize_markdown(state: dict[str, Any]) -> str:
     return "\n".join(lines)
 
 
+def _serialize_state_only(state: dict[str, Any]) -> str:
+    """Serialize only the fenced JSON state block, skipping markdown rendering.
+
+    The result loads like any other plan file but has no human-readable view.
+    """
+    return "\n".join(
+        [
+            STATE_START,
+            "```json",
+            _dump_state_json(state),
+            "```",
+            STATE_END,
+            "",
+        ]
+    )
+
+
+def _write_raw_state(plan_file: str | Path, state: dict[str, Any]) -> None:
+    """Write only the fenced JSON state block; intended for seeding fixtures."""
+    Path(plan_file).write_text(_serialize_state_only(state), encoding="utf-8")
+
+
 def _load_state_from_markdown(content: str) -> dict[str, Any]:
-    """Extract JSON state from markdown content."""
-    match = STATE_PATTERN.search(content)
-    if not match:
+    """Extract and coerce the embedded JSON state from plan markdown.
+
+    This is the only parser for plan files. It uses the last state block, so
+    marker text quoted earlier in the document (for example in the task) is
+    ignored, and it tolerates extra whitespace around the fences.
+    """
+    # Markers only count at the start of a line: JSON string values always sit
+    # after a key, so marker text copied into the state itself never matches.
+    text = f"\n{content}"
+    end_at = text.rfind(f"\n{STATE_END}")
+    start_at = text.rfind(f"\n{STATE_START}", 0, end_at) if end_at >= 0 else -1
+    block = text[start_at + 1 + len(STATE_START) : end_at] if start_at >= 0 else ""
+    open_at = block.find("{")
+    close_at = block.rfind("}")
+    if (
+        open_at < 0
+        or close_at < open_at
+        or block[:open_at].split() != ["```json"]
+        or block[close_at + 1 :].split() != ["```"]
+    ):
         raise ValueError("Plan file is missing embedded JSON state markers")
 
     try:
-        loaded = json.loads(match.group(1))
+        loaded = json.loads(block[open_at : close_at + 1])
     except json.JSONDecodeError as err:
         raise ValueError(f"Plan file contains invalid JSON state: {err}") from err
 
@@ -289,11 +381,256 @@ def _load_state_from_markdown(content: str) -> dict[str, Any]:
     return _coerce_state(loaded)
 
 
-def _write_state(plan_path: Path, state: dict[str, Any]) -> str:
-    """Persist state into markdown file."""
+def _atomic_write_text(target: Path, text: str) -> None:
+    """Write text to a sibling temp file and atomically swap it into place.
+
+    Readers never observe a truncated or half-written plan. A new file gets
+    mode 0o666 under the umask, as write_text would; a replaced file keeps its
+    permission bits. Callers pass resolved paths, so a symlink here was swapped
+    in afterwards and is refused rather than overwritten with a regular file.
+    """
+    try:
+        existing = os.lstat(target)
+    except FileNotFoundError:
+        existing = None
+    if existing is not None and stat.S_ISLNK(existing.st_mode):
+        raise OSError(errno.ELOOP, "Refusing to replace a symlink", str(target))
+
+    data = memoryview(text.encode("utf-8"))
+    tmp_path = target.with_name(f".{target.name}.{os.urandom(16).hex()}.tmp")
+    fd = os.open(
+        tmp_path,
+        os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0),
+        0o666,
+    )
     try:
+        try:
+            # One write() normally covers the whole payload; loop on short writes.
+            while data:
+                data = data[os.write(fd, data) :]
+        finally:
+            os.close(fd)
+        if existing is not None:
+            os.chmod(tmp_path, stat.S_IMODE(existing.st_mode))
+        os.replace(tmp_path, target)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _stat_fingerprint(stats: os.stat_result) -> tuple[int, int, int, int]:
+    """Identify one version of a file by inode, size, and change timestamps."""
+    return (stats.st_ino, stats.st_size, stats.st_mtime_ns, stats.st_ctime_ns)
+
+
+class FilePlanBackend:
+    """Persist plan state as markdown files with embedded JSON.
+
+    Parsed states are kept in memory, keyed by the markdown file's stat
+    fingerprint, so repeated loads of an unchanged plan skip reading it. Files
+    modified within `PLAN_CACHE_RACY_NS` are always re-read: an in-place edit
+    inside one timestamp tick can keep the same size and mtime. Saves only
+    drop the entry, since the next load would fall inside that window anyway.
+    """
+
+    def __init__(self) -> None:
+        self._cache: dict[Path, tuple[tuple[int, int, int, int], dict[str, Any]]] = {}
+
+    def exists(self, plan_path: Path) -> bool:
+        return plan_path.exists()
+
+    def is_file(self, plan_path: Path) -> bool:
+        return plan_path.is_file()
+
+    def load(self, plan_path: Path) -> dict[str, Any]:
+        """Load coerced state; raises OSError on read and ValueError on parse."""
+        try:
+            fingerprint = _stat_fingerprint(plan_path.stat())
+        except OSError:
+            fingerprint = None
+        cached = self._cache.get(plan_path)
+        if (
+            cached is not None
+            and cached[0] == fingerprint
+            and time.time_ns() - fingerprint[2] > PLAN_CACHE_RACY_NS
+        ):
+            return _copy_state(cached[1])
+
+        state = self._load_uncached(plan_path)
+        if fingerprint is not None:
+            self._cache[plan_path] = (fingerprint, _copy_state(state))
+        return state
+
+    def _load_uncached(self, plan_path: Path) -> dict[str, Any]:
+        return _load_state_from_markdown(plan_path.read_text(encoding="utf-8"))
+
+    def save(self, plan_path: Path, state: dict[str, Any]) -> None:
+        self._cache.pop(plan_path, None)
+        plan_path.parent.mkdir(parents=True, exist_ok=True)
+        serialize = (
+            _serialize_markdown if RENDER_MARKDOWN_VIEW else _serialize_state_only
+        )
+        _atomic_write_text(plan_path, serialize(state))
+
+    def delete(self, plan_path: Path) -> None:
+        self._cache.pop(plan_path, None)
+        plan_path.unlink(missing_ok=True)
+
+
+class MemoryPlanBackend:
+    """Keep plan state in a process-local dict keyed by resolved plan path.
+
+    Intended for tests that exercise plan logic rather than the markdown
+    serialization, skipping the write/read/regex/JSON round-trip per call.
+    """
+
+    def __init__(self) -> None:
+        self._states: dict[Path, dict[str, Any]] = {}
+
+    def exists(self, plan_path: Path) -> bool:
+        return plan_path in self._states
+
+    def is_file(self, plan_path: Path) -> bool:
+        return plan_path in self._states
+
+    def load(self, plan_path: Path) -> dict[str, Any]:
+        try:
+            stored = self._states[plan_path]
+        except KeyError as err:
+            raise OSError(f"No in-memory plan state for '{plan_path}'") from err
+        return _coerce_state(stored)
+
+    def save(self, plan_path: Path, state: dict[str, Any]) -> None:
+        self._states[plan_path] = deepcopy(state)
+
+    def delete(self, plan_path: Path) -> None:
+        self._states.pop(plan_path, None)
+
+
+class SqlitePlanBackend:
+    """Keep plan states as JSON rows in one SQLite database.
+
+    Suited to agents that juggle many plans or very long runs: each save is a
+    single upsert in WAL mode instead of a markdown render plus file swap, and
+    all plans share one file. Markdown is rendered only on `export_markdown`.
+    Select it with `configure_backend("sqlite", db_path)`.
+    """
+
+    def __init__(self, db_path: str | Path) -> None:
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(db_path), isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS plans "
+            "(path TEXT PRIMARY KEY, state TEXT NOT NULL)"
+        )
+
+    def exists(self, plan_path: Path) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM plans WHERE path = ?", (plan_path.as_posix(),)
+            ).fetchone()
+        return row is not None
+
+    def is_file(self, plan_path: Path) -> bool:
+        return self.exists(plan_path)
+
+    def load(self, plan_path: Path) -> dict[str, Any]:
+        """Load coerced state; raises OSError when missing, ValueError on parse."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state FROM plans WHERE path = ?", (plan_path.as_posix(),)
+            ).fetchone()
+        if row is None:
+            raise OSError(f"No stored plan state for '{plan_path}'")
+        try:
+            loaded = json.loads(row[0])
+        except json.JSONDecodeError as err:
+            raise ValueError(f"Plan database holds invalid JSON state: {err}") from err
+        if not isinstance(loaded, dict):
+            raise ValueError("Plan state must be a JSON object")
+        return _coerce_state(loaded)
+
+    def save(self, plan_path: Path, state: dict[str, Any]) -> None:
+        payload = json.dumps(state, separators=(",", ":"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO plans (path, state) VALUES (?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET state = excluded.state",
+                (plan_path.as_posix(), payload),
+            )
+
+    def delete(self, plan_path: Path) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM plans WHERE path = ?", (plan_path.as_posix(),)
+            )
+
+    def export_markdown(self, plan_path: Path) -> None:
+        """Render one stored plan to its markdown file on disk."""
+        state = self.load(plan_path)
         plan_path.parent.mkdir(parents=True, exist_ok=True)
-        plan_path.write_text(_serialize_markdown(state), encoding="utf-8")
+        _atomic_write_text(plan_path, _serialize_markdown(state))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+PlanBackend = FilePlanBackend | MemoryPlanBackend | SqlitePlanBackend
+
+_BACKEND: PlanBackend = FilePlanBackend()
+
+
+def configure_backend(
+    kind: str = "file",
+    db_path: str | None = None,
+    *,
+    render_markdown: bool = True,
+) -> None:
+    """Select the module-wide plan backend: "file" or "sqlite".
+
+    `db_path` is resolved inside the workspace and is required for "sqlite".
+    Re-selecting the current backend keeps it, so cached state and the open
+    database connection survive repeated configuration. `render_markdown=False`
+    makes the file backend write only the JSON state block.
+    """
+    global _BACKEND, RENDER_MARKDOWN_VIEW
+    backend: PlanBackend = _BACKEND
+    if kind == "file":
+        if not isinstance(_BACKEND, FilePlanBackend):
+            backend = FilePlanBackend()
+    elif kind == "sqlite":
+        if not db_path:
+            raise ValueError("The sqlite plan backend requires a database path")
+        resolved = _resolve_workspace_path(db_path)
+        if not (
+            isinstance(_BACKEND, SqlitePlanBackend) and _BACKEND.db_path == resolved
+        ):
+            resolved.parent.mkdir(parents=True, exist_ok=True)
+            backend = SqlitePlanBackend(resolved)
+    else:
+        raise ValueError(f"Unknown plan backend '{kind}'; expected 'file' or 'sqlite'")
+
+    if backend is not _BACKEND and isinstance(_BACKEND, SqlitePlanBackend):
+        _BACKEND.close()
+    _BACKEND = backend
+    RENDER_MARKDOWN_VIEW = render_markdown
+
+
+def _active_backend() -> PlanBackend:
+    """Return the module-wide plan backend."""
+    return _BACKEND
+
+
+def _write_state(plan_path: Path, state: dict[str, Any]) -> str:
+    """Persist state through the active plan backend."""
+    try:
+        _active_backend().save(plan_path, state)
         return f"Saved plan to {_to_workspace_relative(plan_path)}"
     except OSError as err:
         return f"Error: Unable to write plan file '{plan_path.as_posix()}': {err}"
@@ -308,31 +645,50 @@ def _read_existing_state(
     except ValueError as err:
         return None, None, f"Error: {err}"
 
-    if not plan_path.exists():
+    if not _active_backend().exists(plan_path):
         return plan_path, None, f"Error: Plan file '{plan_file}' not found"
-    if not plan_path.is_file():
+    if not _active_backend().is_file(plan_path):
         return plan_path, None, f"Error: '{plan_file}' is not a file"
 
     try:
-        content = plan_path.read_text(encoding="utf-8")
+        state = _active_backend().load(plan_path)
     except OSError as err:
         return plan_path, None, f"Error: Unable to read '{plan_file}': {err}"
-
-    try:
-        state = _load_state_from_markdown(content)
     except ValueError as err:
         return plan_path, None, f"Error: {err}"
     return plan_path, state, ""
 
 
-def _recompute_percent_from_steps(state: dict[str, Any]) -> None:
-    """Recompute completion percentage from plan steps."""
+def load_plan_state(
+    plan_file: str = DEFAULT_PLAN_FILE,
+) -> tuple[dict[str, Any] | None, str]:
+    """Load plan state through the active backend as `(state, error)`.
+
+    On failure the state is None and the error is an "Error: ..." message.
+    """
+    _, state, error = _read_existing_state(plan_file)
+    return state, error
+
+
+def _count_completed(items: list[dict[str, Any]]) -> int:
+    """Count completed checklist items in a single pass."""
+    return sum(1 for item in items if item.get("status") == "completed")
+
+
+def _recompute_percent_from_steps(
+    state: dict[str, Any], completed: int | None = None
+) -> None:
+    """Recompute completion percentage from plan steps.
+
+    Pass `completed` when the caller has already counted completed steps.
+    """
     steps = state.get("steps", [])
     if not steps:
         state["percent_complete"] = 0
         return
 
-    completed = sum(1 for item in steps if item.get("status") == "completed")
+    if completed is None:
+        completed = _count_completed(steps)
     state["percent_complete"] = int(round((completed / len(steps)) * 100))
 
 
@@ -355,7 +711,7 @@ def _maybe_cleanup_plan_file(
         return "Error: cleanup_plan_file requires a completed plan"
 
     try:
-        plan_path.unlink(missing_ok=True)
+        _active_backend().delete(plan_path)
         return f"Completed plan and removed {_to_workspace_relative(plan_path)}"
     except OSError as err:
         return (
@@ -399,7 +755,7 @@ def verify_plan_file(
 
     relative_path = _to_workspace_relative(plan_path)
 
-    if not plan_path.exists():
+    if not _active_backend().exists(plan_path):
         steps = decompose_task(task_text, max_steps=max_steps)
         if steps and steps[0].startswith("Error:"):
             return steps[0]
@@ -413,16 +769,13 @@ def verify_plan_file(
             return created
         return f"Verified plan file by creating {relative_path}"
 
-    if not plan_path.is_file():
+    if not _active_backend().is_file(plan_path):
         return f"Error: '{plan_file}' is not a file"
 
     try:
-        content = plan_path.read_text(encoding="utf-8")
+        state = _active_backend().load(plan_path)
     except OSError as err:
         return f"Error: Unable to read '{plan_file}': {err}"
-
-    try:
-        state = _load_state_from_markdown(content)
     except ValueError:
         steps = decompose_task(task_text, max_steps=max_steps)
         if steps and steps[0].startswith("Error:"):
@@ -474,18 +827,15 @@ def verify_plan_file(
             changed = True
             change_reasons.append("normalized multiple in_progress steps")
 
+    steps = state.get("steps", [])
+    completed = _count_completed(steps)
     previous_percent = state.get("percent_complete")
-    _recompute_percent_from_steps(state)
+    _recompute_percent_from_steps(state, completed)
     if state.get("percent_complete") != previous_percent:
         changed = True
         change_reasons.append("recomputed percent_complete")
 
-    expected_status = (
-        "completed"
-        if state.get("steps")
-        and all(item.get("status") == "completed" for item in state["steps"])
-        else "active"
-    )
+    expected_status = "completed" if steps and completed == len(steps) else "active"
     if state.get("status") != expected_status:
         state["status"] = expected_status
         changed = True
@@ -534,9 +884,9 @@ def create_plan(
     except ValueError as err:
         return f"Error: {err}"
 
-    if plan_path.exists() and not overwrite:
+    if _active_backend().exists(plan_path) and not overwrite:
         return f"Error: Plan file '{plan_file}' already exists and overwrite is False"
-    if plan_path.exists() and plan_path.is_dir():
+    if _active_backend().exists(plan_path) and not _active_backend().is_file(plan_path):
         return f"Error: '{plan_file}' is a directory"
 
     created_at = _now_utc_iso()
@@ -570,39 +920,31 @@ def create_plan(
     )
 
 
-def update_plan(
-    step_number: int,
-    status: str,
-    note: str = "",
-    plan_file: str = DEFAULT_PLAN_FILE,
-) -> str:
-    """Update one plan step status and persist changes."""
+def _validate_step_update(step_number: int, status: str) -> str:
+    """Return an error for an invalid step update, or an empty string."""
     if step_number < 1:
         return "Error: step_number must be >= 1"
     if status not in VALID_STATUSES:
         return "Error: status must be one of: pending, in_progress, completed, blocked"
+    return ""
 
-    plan_path, state, error = _read_existing_state(plan_file)
-    if error:
-        return error
-    if not state or not plan_path:
-        return "Error: Unable to load plan state"
-
-    steps = state.get("steps", [])
-    if not steps:
-        return "Error: Plan has no steps to update"
-    if step_number > len(steps):
-        return f"Error: step_number {step_number} is out of range (1..{len(steps)})"
 
+def _apply_step_update(
+    state: dict[str, Any],
+    step_number: int,
+    status: str,
+    note: str,
+    timestamp: str,
+) -> None:
+    """Set one step's status in memory and log its note, if any."""
+    steps = state["steps"]
     if status == "in_progress":
         for idx, item in enumerate(steps, start=1):
             if idx != step_number and item.get("status") == "in_progress":
                 item["status"] = "pending"
 
-    target = steps[step_number - 1]
-    target["status"] = status
+    steps[step_number - 1]["status"] = status
 
-    timestamp = _now_utc_iso()
     if note.strip():
         state.setdefault("progress_log", []).append(
             {
@@ -612,13 +954,42 @@ def update_plan(
             }
         )
 
-    if steps and all(item.get("status") == "completed" for item in steps):
-        state["status"] = "completed"
-    else:
-        state["status"] = "active"
 
+def _finish_step_updates(state: dict[str, Any], timestamp: str) -> None:
+    """Align plan status and percent after step updates."""
+    steps = state["steps"]
+    completed = _count_completed(steps)
+    state["status"] = "completed" if completed == len(steps) else "active"
     state["updated_at"] = timestamp
-    _recompute_percent_from_steps(state)
+    _recompute_percent_from_steps(state, completed)
+
+
+def update_plan(
+    step_number: int,
+    status: str,
+    note: str = "",
+    plan_file: str = DEFAULT_PLAN_FILE,
+) -> str:
+    """Update one plan step status and persist changes."""
+    validation = _validate_step_update(step_number, status)
+    if validation:
+        return validation
+
+    plan_path, state, error = _read_existing_state(plan_file)
+    if error:
+        return error
+    if not state or not plan_path:
+        return "Error: Unable to load plan state"
+
+    steps = state.get("steps", [])
+    if not steps:
+        return "Error: Plan has no steps to update"
+    if step_number > len(steps):
+        return f"Error: step_number {step_number} is out of range (1..{len(steps)})"
+
+    timestamp = _now_utc_iso()
+    _apply_step_update(state, step_number, status, note, timestamp)
+    _finish_step_updates(state, timestamp)
 
     write_result = _write_state(plan_path, state)
     if write_result.startswith("Error:"):
@@ -630,6 +1001,62 @@ def update_plan(
     )
 
 
+def update_plan_batch(
+    updates: list[dict[str, Any]],
+    plan_file: str = DEFAULT_PLAN_FILE,
+) -> str:
+    """Apply several step updates in order and persist them with one write.
+
+    Each update holds `step_number`, `status`, and an optional `note`. Every
+    update is validated before any is applied, so an invalid entry leaves the
+    plan untouched.
+    """
+    if not updates:
+        return "Error: updates must include at least one step update"
+
+    parsed: list[tuple[int, str, str]] = []
+    for position, update in enumerate(updates, start=1):
+        if not isinstance(update, dict):
+            return f"Error: update {position} must be an object"
+        step_number = update.get("step_number")
+        status = update.get("status")
+        note = update.get("note") or ""
+        if (
+            not isinstance(step_number, int)
+            or isinstance(step_number, bool)
+            or not isinstance(status, str)
+        ):
+            return f"Error: update {position} needs an integer step_number and a status"
+        validation = _validate_step_update(step_number, status)
+        if validation:
+            return f"{validation} (update {position})"
+        parsed.append((step_number, status, str(note)))
+
+    plan_path, state, error = _read_existing_state(plan_file)
+    if error:
+        return error
+    if not state or not plan_path:
+        return "Error: Unable to load plan state"
+
+    steps = state.get("steps", [])
+    if not steps:
+        return "Error: Plan has no steps to update"
+    for step_number, _, _ in parsed:
+        if step_number > len(steps):
+            return f"Error: step_number {step_number} is out of range (1..{len(steps)})"
+
+    timestamp = _now_utc_iso()
+    for step_number, status, note in parsed:
+        _apply_step_update(state, step_number, status, note, timestamp)
+    _finish_step_updates(state, timestamp)
+
+    write_result = _write_state(plan_path, state)
+    if write_result.startswith("Error:"):
+        return write_result
+
+    return f"Updated {len(parsed)} step(s) in {_to_workspace_relative(plan_path)}"
+
+
 def decompose_task(task: str, max_steps: int = 6) -> list[str]:
     """Decompose task text into ordered implementation steps."""
     if max_steps <= 0:
@@ -639,12 +1066,11 @@ def decompose_task(task: str, max_steps: int = 6) -> list[str]:
     if not normalized:
         return ["Error: task must not be empty"]
 
-    candidates: list[str] = []
-    for sentence in re.split(r"[;\n.]+", normalized):
-        for part in re.split(r"\b(?:then|after that|next)\b", sentence, flags=re.I):
-            cleaned = part.strip(" ,:-")
-            if cleaned:
-                candidates.append(cleaned)
+    candidates = [
+        cleaned
+        for part in _STEP_SPLIT_RE.split(normalized)
+        if (cleaned := part.strip(" ,:-"))
+    ]
 
     if len(candidates) < 2 and "," in normalized:
         for part in normalized.split(","):
@@ -690,10 +1116,9 @@ def set_subgoals(
     if replace:
         merged = normalized_subgoals
     else:
-        merged = _normalize_text_items(
-            [item.get("description", "") for item in current_subgoals]
-            + normalized_subgoals
-        )
+        # Loaded descriptions are already stripped and non-empty, and the
+        # status map holds them once each in order; only the merge needs dedupe.
+        merged = list(dict.fromkeys([*status_by_description, *normalized_subgoals]))
 
     updated_subgoals: list[dict[str, Any]] = []
     for idx, description in enumerate(merged, start=1):
@@ -730,7 +1155,9 @@ def track_progress(
     if not note:
         return "Error: message must not be empty"
     if percent_complete is not None and (
-        percent_complete < 0 or percent_complete > 100
+        isinstance(percent_complete, bool)
+        or percent_complete < 0
+        or percent_complete > 100
     ):
         return "Error: percent_complete must be between 0 and 100"
 
@@ -758,14 +1185,14 @@ def track_progress(
         state["status"] = "completed"
         state["percent_complete"] = 100
     else:
-        if state.get("steps") and all(
-            item.get("status") == "completed" for item in state["steps"]
-        ):
+        steps = state.get("steps", [])
+        completed = _count_completed(steps)
+        if steps and completed == len(steps):
             state["status"] = "completed"
         else:
             state["status"] = "active"
         if percent_complete is None:
-            _recompute_percent_from_steps(state)
+            _recompute_percent_from_steps(state, completed)
 
     state["updated_at"] = timestamp
 